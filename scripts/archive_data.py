@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+archive_data.py — Pre-aggregated archive and taxonomy data for Reel Refractions
+===============================================================================
+
+Reads the front matter of every bundle in content/posts/ and writes the
+groupings the Vault, taxonomy, sidebar and lineage templates need to
+data/archive/, so Hugo reads them as site.Data.archive instead of
+re-deriving them from site.RegularPages on every render.
+
+`npm run build` (and `npm run dev`) run this before Hugo, so the data is
+always current in a build and the templates read it without any fallback.
+
+Usage:
+    python scripts/archive_data.py            # refresh data/archive/
+    python scripts/archive_data.py --check    # exit 1 if data/archive/ is stale
+
+Requirements:
+    - pip install pyyaml
+
+Outputs (data/archive/):
+    years.json    — published posts grouped by year and month, newest first,
+                    plus the most recent posts (used by vault.html and
+                    partials/sidebar_right.html)
+    terms.json    — tag and category counts, alphabetical, plus the most
+                    used tags (used by terms.html and
+                    partials/sidebar_right.html)
+    lineage.json  — lowercased post titles mapped to their posts, so a film
+                    cited in genre_lineage links to its review (used by
+                    partials/genre_lineage.html)
+
+Posts are referenced by content path ("/posts/<bundle>") for site.GetPage,
+so links stay correct whatever slug or permalink config is in effect.
+
+Only bundles whose index.md hash changed since the last run are re-parsed;
+the per-post records live in .cache/archive_manifest.json (gitignored).
+Drafts, future-dated and expired posts are left out, as in a production
+build.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import yaml
+
+
+POSTS_DIR = Path("content") / "posts"
+DATA_DIR = Path("data") / "archive"
+MANIFEST_PATH = Path(".cache") / "archive_manifest.json"
+MANIFEST_VERSION = 2
+RECENT_POSTS = 5   # partials/sidebar_right.html "Recent Posts"
+TOP_TAGS = 12      # partials/sidebar_right.html "Tags"
+
+_FRONT_MATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*(?:\n|\Z)", re.DOTALL)
+
+
+def read_front_matter(markdown: str) -> dict:
+    """Return the YAML front matter of a post as a dict ({} if absent)."""
+    match = _FRONT_MATTER_RE.match(markdown)
+    if not match:
+        return {}
+    data = yaml.safe_load(match.group(1))
+    return data if isinstance(data, dict) else {}
+
+
+def _to_datetime(value) -> datetime | None:
+    """Coerce a front matter date (datetime, date or ISO string) to an aware datetime."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if isinstance(value, str) and value.strip():
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _as_list(value) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value if v is not None and str(v).strip()]
+
+
+def post_record(bundle: str, front_matter: dict) -> dict:
+    """Extract the fields the aggregates need from one post's front matter.
+
+    Dates are stored as ISO strings so the record can be cached as JSON.
+    """
+    published = _to_datetime(front_matter.get("publishDate")) or _to_datetime(front_matter.get("date"))
+    expiry = _to_datetime(front_matter.get("expiryDate"))
+    return {
+        "page": f"/posts/{bundle}",
+        "title": str(front_matter.get("title") or bundle),
+        "date": published.isoformat() if published else None,
+        "expiry": expiry.isoformat() if expiry else None,
+        "draft": bool(front_matter.get("draft", False)),
+        "weight": int(front_matter.get("weight") or 0),
+        "tags": _as_list(front_matter.get("tags")),
+        "categories": _as_list(front_matter.get("categories")),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------------
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict:
+    """Load the per-post record cache, or return an empty one if missing or stale."""
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {"version": MANIFEST_VERSION, "posts": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "posts": {}}
+    return manifest
+
+
+def collect_records(
+    posts_dir: Path = POSTS_DIR,
+    manifest_path: Path = MANIFEST_PATH,
+    save_manifest: bool = True,
+) -> tuple[list[dict], int]:
+    """Return (records for every bundle, number of bundles re-parsed).
+
+    Bundles whose index.md hash matches the manifest reuse the cached record.
+    The manifest is rewritten only when something changed and save_manifest
+    is set.
+    """
+    manifest = load_manifest(manifest_path)
+    cached = manifest["posts"]
+    entries = {}
+    parsed = 0
+    for path in sorted(posts_dir.glob("*/index.md")):
+        bundle = path.parent.name
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        entry = cached.get(bundle)
+        if entry is None or entry["sha256"] != digest:
+            try:
+                front_matter = read_front_matter(raw.decode("utf-8"))
+            except yaml.YAMLError as e:
+                print(f"Error: Invalid front matter in {path}: {e}")
+                sys.exit(1)
+            entry = {"sha256": digest, "record": post_record(bundle, front_matter)}
+            parsed += 1
+        entries[bundle] = entry
+
+    if save_manifest and entries != cached:
+        manifest["posts"] = entries
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    return [entry["record"] for entry in entries.values()], parsed
+
+
+def is_published(record: dict, now: datetime) -> bool:
+    """Mirror Hugo's production filter: no drafts, future-dated or expired posts."""
+    if record["draft"]:
+        return False
+    if record["date"] and datetime.fromisoformat(record["date"]) > now:
+        return False
+    if record["expiry"] and datetime.fromisoformat(record["expiry"]) <= now:
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Aggregates
+# ---------------------------------------------------------------------------
+
+
+def _term_key(name: str) -> str:
+    """Normalise a term the way Hugo merges taxonomy terms ("Sci Fi" == "sci-fi")."""
+    return re.sub(r"[\s_]+", "-", name.strip().lower())
+
+
+def _post_entry(record: dict) -> dict:
+    return {"page": record["page"], "title": record["title"], "date": record["date"][:10]}
+
+
+def build_years(records: list[dict]) -> dict:
+    """Group dated posts by year and month, newest first (Hugo's default page order).
+
+    recent lists the RECENT_POSTS latest posts by date alone, as the sidebar shows them.
+    """
+    dated = [r for r in records if r["date"]]
+    dated.sort(key=lambda r: r["title"].lower())
+    dated.sort(key=lambda r: r["date"], reverse=True)
+    dated.sort(key=lambda r: (r["weight"] == 0, r["weight"]))
+    years = {}
+    for record in dated:
+        published = datetime.fromisoformat(record["date"])
+        months = years.setdefault(published.year, {})
+        months.setdefault(published.month, []).append(record)
+    return {
+        "post_count": len(records),
+        "recent": [_post_entry(r) for r in sorted(dated, key=lambda r: r["date"], reverse=True)[:RECENT_POSTS]],
+        "years": [
+            {
+                "year": str(year),
+                "count": sum(len(posts) for posts in years[year].values()),
+                "months": [
+                    {"month": date(year, month, 1).strftime("%B"), "posts": [_post_entry(r) for r in years[year][month]]}
+                    for month in sorted(years[year], reverse=True)
+                ],
+            }
+            for year in sorted(years, reverse=True)
+        ],
+    }
+
+
+def _count_terms(values: list[list[str]]) -> dict[str, dict]:
+    """Return {term key: {"name", "count"}}, keeping the first spelling seen as the name."""
+    counts = {}
+    for names in values:
+        for name in names:
+            key = _term_key(name)
+            if key not in counts:
+                counts[key] = {"name": name.strip(), "count": 0}
+            counts[key]["count"] += 1
+    return counts
+
+
+def build_terms(records: list[dict]) -> dict:
+    """Count posts per tag and category, alphabetically by term.
+
+    top_tags lists the TOP_TAGS most used tags in Hugo's ByCount order
+    (count descending, then term key).
+    """
+    tags = _count_terms([r["tags"] for r in records])
+    categories = _count_terms([r["categories"] for r in records])
+    return {
+        "tags": [tags[key] for key in sorted(tags)],
+        "categories": [categories[key] for key in sorted(categories)],
+        "top_tags": [tags[key] for key in sorted(tags, key=lambda k: (-tags[k]["count"], k))[:TOP_TAGS]],
+    }
+
+
+def build_lineage(records: list[dict]) -> dict:
+    """Map each lowercased post title to its post.
+
+    The lineage partial looks up the films a review cites, so a cited film
+    that has its own review links to it.
+    """
+    reviewed = {r["title"].strip().lower(): r["page"] for r in records}
+    return {"reviewed": dict(sorted(reviewed.items()))}
+
+
+def build_archive(records: list[dict], now: datetime | None = None) -> dict[str, dict]:
+    """Return {data file stem: contents} for the published records."""
+    now = now or datetime.now(timezone.utc)
+    published = [r for r in records if is_published(r, now)]
+    return {
+        "years": build_years(published),
+        "terms": build_terms(published),
+        "lineage": build_lineage(published),
+    }
+
+
+def render(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=1) + "\n"
+
+
+def write_archive(archive: dict[str, dict], data_dir: Path = DATA_DIR) -> list[Path]:
+    """Write each data file whose contents changed. Returns the paths written."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for stem, data in archive.items():
+        path = data_dir / f"{stem}.json"
+        text = render(data)
+        if path.is_file() and path.read_text(encoding="utf-8") == text:
+            continue
+        path.write_text(text, encoding="utf-8")
+        written.append(path)
+    return written
+
+
+def stale_files(archive: dict[str, dict], data_dir: Path = DATA_DIR) -> list[Path]:
+    """Return data files that are missing or differ from archive."""
+    return [
+        data_dir / f"{stem}.json"
+        for stem, data in archive.items()
+        if not (data_dir / f"{stem}.json").is_file()
+        or (data_dir / f"{stem}.json").read_text(encoding="utf-8") != render(data)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-aggregate archive and taxonomy data for the Hugo templates.")
+    parser.add_argument("--posts", default=str(POSTS_DIR), help=f"Posts directory (default: {POSTS_DIR})")
+    parser.add_argument("--data", default=str(DATA_DIR), help=f"Output directory (default: {DATA_DIR})")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH), help=f"Hash manifest (default: {MANIFEST_PATH})")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the data files are out of date; write nothing")
+    args = parser.parse_args()
+
+    posts_dir = Path(args.posts)
+    if not posts_dir.is_dir():
+        print(f"Error: Posts directory not found: {posts_dir}")
+        sys.exit(1)
+
+    records, parsed = collect_records(posts_dir, Path(args.manifest), save_manifest=not args.check)
+    archive = build_archive(records)
+    data_dir = Path(args.data)
+
+    if args.check:
+        stale = stale_files(archive, data_dir)
+        if stale:
+            print("Out of date: " + ", ".join(str(p) for p in stale))
+            print("Run: python scripts/archive_data.py")
+            sys.exit(1)
+        print("Archive data is up to date.")
+        return
+
+    written = write_archive(archive, data_dir)
+    print(f"{len(records)} posts ({parsed} re-parsed), {archive['years']['post_count']} published.")
+    print("Updated: " + ", ".join(p.name for p in written) if written else "Data files unchanged.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,784 @@
+#!/usr/bin/env python3
+"""
+critical_css.py — Critical-CSS extraction and unused-selector purge for Reel Refractions
+========================================================================================
+
+assets/css/custom.css is loaded render-blocking on every page, but each
+template only uses a fraction of it. This post-build step reads the generated
+public/ HTML, works out which selectors actually match per template type, and
+rewrites every page so that:
+
+    - the above-the-fold subset is inlined in a <style> block
+    - the rest of the matched rules load from a deferred, per-template stylesheet
+    - rules that match nothing on that template type are dropped entirely
+
+Usage:
+    hugo --gc --minify
+    python scripts/critical_css.py [public_dir] [--fold N] [--safelist TOKEN ...]
+                                   [--report report.json] [--dry-run]
+
+Requirements:
+    - Python standard library only
+
+How "above the fold" is decided:
+    There is no browser here, so the fold is approximated in document order:
+    an element is critical if it is one of the first --fold elements in the
+    page (SVG internals are not counted) or if it is a structural wrapper no
+    deeper than --layout-depth below <body> (the three-column grid and its
+    asides). A selector is critical if its earliest match is critical.
+
+The deferred stylesheet keeps every matched rule — including the critical
+ones — in source order, so the cascade is identical once it has loaded.
+Selectors for state that only exists after JavaScript runs (search results,
+the open hamburger menu, code copy buttons) are never purged: selectors
+using a class name that the site's JS adds (inline <script>s and .js files
+in public_dir, including the theme's fastsearch results) are kept, matching
+whole class names only, and --safelist adds more substrings.
+
+`npm run build` runs this after Hugo, so the deployed site is the processed one.
+
+Rewritten pages are marked, so running the script again on the same
+public/ leaves them alone; rebuild with Hugo to reprocess.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+
+DEFAULT_FOLD = 150
+DEFAULT_LAYOUT_DEPTH = 2
+DEFAULT_STYLESHEET = "custom"
+
+# Any selector containing one of these substrings is always kept (deferred).
+DEFAULT_SAFELIST = (
+    "#searchResults",
+    "aria-expanded",
+    ".copy-code",
+    ".post-entry",
+)
+
+# Attribute on the injected <style>; pages carrying it have been processed.
+PROCESSED_MARKER = "data-critical-css"
+
+_GROUPING_AT_RULES = frozenset({"@media", "@supports", "@layer", "@container", "@document"})
+
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+
+# Tags whose start implicitly closes an open <p> (HTML5 "in button scope").
+_P_CLOSERS = frozenset({
+    "address", "article", "aside", "blockquote", "details", "div", "dl",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3",
+    "h4", "h5", "h6", "header", "hr", "main", "menu", "nav", "ol", "p",
+    "pre", "section", "table", "ul",
+})
+_P_SCOPE_BOUNDARIES = frozenset({"button", "td", "th", "table", "caption", "html", "template", "object"})
+
+# Minified output drops optional end tags, so these start tags close a sibling.
+_IMPLIED_SIBLING_END = {
+    "li": ({"li"}, {"ul", "ol", "menu"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+    "tr": ({"tr"}, {"table", "thead", "tbody", "tfoot"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "option": ({"option"}, {"select", "datalist"}),
+}
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+_COMBINATOR_RE = re.compile(r"\s*([>+~])\s*|\s+")
+_SIMPLE_SELECTOR_RE = re.compile(
+    r"""
+      (?P<tag>\*|[a-zA-Z][\w-]*)
+    | \#(?P<id>-?[_a-zA-Z][\w-]*)
+    | \.(?P<cls>-?[_a-zA-Z][\w-]*)
+    | \[(?P<attr>[^\]]+)\]
+    | (?P<pseudo>::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?)
+    """,
+    re.VERBOSE,
+)
+_ATTR_RE = re.compile(
+    r"""^\s*(?P<name>[\w:-]+)\s*
+        (?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s\]]+)))?
+        \s*(?:[iIsS])?\s*$""",
+    re.VERBOSE,
+)
+_LINK_TAG_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_SCRIPT_RE = re.compile(r"<script\b[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+_JS_STRING_RE = re.compile(r"""(['"`])((?:\\.|(?!\1).)*)\1""", re.DOTALL)
+_JS_CLASS_LIST_RE = re.compile(r"classList\.(?:add|toggle|replace)\(([^)]*)\)")
+_JS_CLASS_NAME_RE = re.compile(r"""className\s*\+?=\s*(['"`])([^'"`]*)\1""")
+_JS_CLASS_ATTR_RE = re.compile(r"""class=\\?(['"])([^'"\\]*)""")
+_CLASS_NAME_RE = re.compile(r"^-?[_a-zA-Z][\w-]*$")
+_SELECTOR_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+
+
+# ---------------------------------------------------------------------------
+# CSS parsing
+# ---------------------------------------------------------------------------
+
+
+def _skip_string(css: str, pos: int) -> int:
+    """Return the index just past the quoted string starting at pos."""
+    quote = css[pos]
+    pos += 1
+    while pos < len(css):
+        if css[pos] == "\\":
+            pos += 2
+            continue
+        if css[pos] == quote:
+            return pos + 1
+        pos += 1
+    return pos
+
+
+def _find_block_end(css: str, pos: int) -> int:
+    """Return the index of the '}' closing the block whose body starts at pos."""
+    depth = 1
+    while pos < len(css):
+        ch = css[pos]
+        if ch in "\"'":
+            pos = _skip_string(css, pos)
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return pos
+        pos += 1
+    return len(css)
+
+
+def split_selector_list(prelude: str) -> list[str]:
+    """Split a selector list on top-level commas, normalising whitespace.
+
+    Commas inside parentheses, attribute brackets or strings (e.g. ``:is(a, b)``)
+    do not split.
+    """
+    selectors = []
+    depth = 0
+    start = 0
+    pos = 0
+    while pos < len(prelude):
+        ch = prelude[pos]
+        if ch in "\"'":
+            pos = _skip_string(prelude, pos)
+            continue
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            selectors.append(prelude[start:pos])
+            start = pos + 1
+        pos += 1
+    selectors.append(prelude[start:])
+    return [_WHITESPACE_RE.sub(" ", s).strip() for s in selectors if s.strip()]
+
+
+def _parse_block(css: str, pos: int) -> tuple[list[dict], int]:
+    rules = []
+    start = pos
+    while pos < len(css):
+        ch = css[pos]
+        if ch in "\"'":
+            pos = _skip_string(css, pos)
+            continue
+        if ch == ";":
+            # Statement at-rules such as @import or @charset
+            text = css[start:pos].strip()
+            if text:
+                rules.append({"type": "at", "text": text + ";"})
+            pos += 1
+            start = pos
+            continue
+        if ch == "{":
+            prelude = _WHITESPACE_RE.sub(" ", css[start:pos]).strip()
+            keyword = prelude.split(" ", 1)[0].lower()
+            if keyword in _GROUPING_AT_RULES:
+                children, pos = _parse_block(css, pos + 1)
+                rules.append({"type": "group", "prelude": prelude, "rules": children})
+            else:
+                end = _find_block_end(css, pos + 1)
+                body = _WHITESPACE_RE.sub(" ", css[pos + 1:end]).strip()
+                if prelude.startswith("@"):
+                    rules.append({"type": "at", "text": f"{prelude}{{{body}}}"})
+                else:
+                    rules.append({
+                        "type": "rule",
+                        "selectors": split_selector_list(prelude),
+                        "body": body,
+                    })
+                pos = end + 1
+            start = pos
+            continue
+        if ch == "}":
+            return rules, pos + 1
+        pos += 1
+    return rules, pos
+
+
+def parse_css(css: str) -> list[dict]:
+    """Parse a stylesheet into a list of rule dicts.
+
+    Each entry is one of:
+        {"type": "rule",  "selectors": [...], "body": "..."}
+        {"type": "group", "prelude": "@media ...", "rules": [...]}
+        {"type": "at",    "text": "@font-face{...}"}
+    Comments are discarded.
+    """
+    rules, _ = _parse_block(_COMMENT_RE.sub("", css), 0)
+    return rules
+
+
+def serialize_css(rules: list[dict]) -> str:
+    """Serialise parsed rules back to compact CSS. Empty groups are dropped."""
+    out = []
+    for rule in rules:
+        if rule["type"] == "rule":
+            if rule["selectors"]:
+                out.append(",".join(rule["selectors"]) + "{" + rule["body"] + "}")
+        elif rule["type"] == "group":
+            inner = serialize_css(rule["rules"])
+            if inner:
+                out.append(rule["prelude"] + "{" + inner + "}")
+        else:
+            out.append(rule["text"])
+    return "".join(out)
+
+
+def iter_selectors(rules: list[dict]):
+    """Yield every selector in the stylesheet, including those inside groups."""
+    for rule in rules:
+        if rule["type"] == "rule":
+            yield from rule["selectors"]
+        elif rule["type"] == "group":
+            yield from iter_selectors(rule["rules"])
+
+
+def filter_rules(rules: list[dict], keep: set[str], keep_at: bool = True) -> list[dict]:
+    """Return a copy of rules containing only the selectors in keep.
+
+    keep_at controls non-grouping at-rules (@font-face, @keyframes, @import):
+    True keeps all of them, False keeps only @font-face.
+    """
+    filtered = []
+    for rule in rules:
+        if rule["type"] == "rule":
+            selectors = [s for s in rule["selectors"] if s in keep]
+            if selectors:
+                filtered.append({**rule, "selectors": selectors})
+        elif rule["type"] == "group":
+            children = filter_rules(rule["rules"], keep, keep_at)
+            if children:
+                filtered.append({**rule, "rules": children})
+        elif keep_at or rule["text"].lower().startswith("@font-face"):
+            filtered.append(rule)
+    return filtered
+
+
+# ---------------------------------------------------------------------------
+# HTML parsing
+# ---------------------------------------------------------------------------
+
+
+def _new_element(tag: str, attrs: list[tuple[str, str | None]], parent: dict | None) -> dict:
+    attr_map = {name: (value if value is not None else "") for name, value in attrs}
+    element = {
+        "tag": tag,
+        "attrs": attr_map,
+        "id": attr_map.get("id", ""),
+        "classes": frozenset(attr_map.get("class", "").split()),
+        "parent": parent,
+        "children": [],
+        "sibling_index": 0,
+        "depth": 0 if parent is None else parent["depth"] + 1,
+        "index": 0,
+    }
+    if parent is not None:
+        element["sibling_index"] = len(parent["children"])
+        parent["children"].append(element)
+    return element
+
+
+class _DomBuilder(HTMLParser):
+    """Build a minimal element tree, tolerating omitted optional end tags."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _new_element("#document", [], None)
+        self.stack = [self.root]
+        self.elements = []
+        self.counted = 0
+
+    def _close_to(self, names: set[str], boundaries: set[str]) -> None:
+        for i in range(len(self.stack) - 1, 0, -1):
+            tag = self.stack[i]["tag"]
+            if tag in names:
+                del self.stack[i:]
+                return
+            if tag in boundaries:
+                return
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _IMPLIED_SIBLING_END:
+            self._close_to(*_IMPLIED_SIBLING_END[tag])
+        if tag in _P_CLOSERS:
+            self._close_to({"p"}, _P_SCOPE_BOUNDARIES)
+
+        parent = self.stack[-1]
+        element = _new_element(tag, attrs, parent)
+        # SVG internals inherit their <svg>'s position so icons and the
+        # filmstrip pattern do not push real content below the fold.
+        in_svg = any(e["tag"] == "svg" for e in self.stack)
+        if in_svg:
+            element["index"] = parent["index"]
+        else:
+            element["index"] = self.counted
+            self.counted += 1
+        self.elements.append(element)
+        if tag not in _VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_endtag(self, tag):
+        self._close_to({tag}, set())
+
+
+def parse_html(html: str) -> dict:
+    """Parse HTML into a document dict with "root" and "elements" (document order)."""
+    builder = _DomBuilder()
+    builder.feed(html)
+    builder.close()
+    body_depth = next((e["depth"] for e in builder.elements if e["tag"] == "body"), 1)
+    return {"root": builder.root, "elements": builder.elements, "body_depth": body_depth}
+
+
+# ---------------------------------------------------------------------------
+# Selector matching
+# ---------------------------------------------------------------------------
+
+
+def _empty_compound() -> dict:
+    return {"tag": None, "id": None, "classes": [], "attrs": [], "seen": False}
+
+
+def parse_selector(selector: str) -> list[tuple[str | None, dict]] | None:
+    """Parse a complex selector into [(combinator, compound), ...] left to right.
+
+    The combinator is the one *preceding* its compound (None for the first).
+    Pseudo-classes and pseudo-elements are ignored, which can only widen a
+    match — the safe direction for purging. Returns None if the selector uses
+    syntax this parser does not understand.
+    """
+    parts = []
+    combinator = None
+    compound = _empty_compound()
+    selector = selector.strip()
+    pos = 0
+    while pos < len(selector):
+        ch = selector[pos]
+        if ch.isspace() or ch in ">+~":
+            match = _COMBINATOR_RE.match(selector, pos)
+            if compound["seen"]:
+                parts.append((combinator, compound))
+                compound = _empty_compound()
+            combinator = match.group(1) or " "
+            pos = match.end()
+            continue
+        match = _SIMPLE_SELECTOR_RE.match(selector, pos)
+        if not match:
+            return None
+        compound["seen"] = True
+        if match.group("tag"):
+            if match.group("tag") != "*":
+                compound["tag"] = match.group("tag").lower()
+        elif match.group("id"):
+            compound["id"] = match.group("id")
+        elif match.group("cls"):
+            compound["classes"].append(match.group("cls"))
+        elif match.group("attr"):
+            attr = _ATTR_RE.match(match.group("attr"))
+            if not attr:
+                return None
+            value = next((v for v in attr.group("dq", "sq", "bare") if v is not None), None)
+            compound["attrs"].append((attr.group("name").lower(), attr.group("op"), value))
+        pos = match.end()
+    if compound["seen"]:
+        parts.append((combinator, compound))
+    return parts or None
+
+
+def _attr_matches(actual: str | None, op: str | None, expected: str | None) -> bool:
+    if actual is None:
+        return False
+    if op is None:
+        return True
+    if op == "=":
+        return actual == expected
+    if op == "~=":
+        return expected in actual.split()
+    if op == "|=":
+        return actual == expected or actual.startswith(expected + "-")
+    if op == "^=":
+        return bool(expected) and actual.startswith(expected)
+    if op == "$=":
+        return bool(expected) and actual.endswith(expected)
+    if op == "*=":
+        return bool(expected) and expected in actual
+    return False
+
+
+def _compound_matches(element: dict, compound: dict) -> bool:
+    if compound["tag"] and element["tag"] != compound["tag"]:
+        return False
+    if compound["id"] and element["id"] != compound["id"]:
+        return False
+    if any(c not in element["classes"] for c in compound["classes"]):
+        return False
+    return all(
+        _attr_matches(element["attrs"].get(name), op, value)
+        for name, op, value in compound["attrs"]
+    )
+
+
+def _is_element(node: dict | None) -> bool:
+    return node is not None and not node["tag"].startswith("#")
+
+
+def _matches_from(element: dict, parts: list, i: int) -> bool:
+    combinator, compound = parts[i]
+    if not _compound_matches(element, compound):
+        return False
+    if i == 0:
+        return True
+    if combinator == ">":
+        parent = element["parent"]
+        return _is_element(parent) and _matches_from(parent, parts, i - 1)
+    if combinator == " ":
+        ancestor = element["parent"]
+        while _is_element(ancestor):
+            if _matches_from(ancestor, parts, i - 1):
+                return True
+            ancestor = ancestor["parent"]
+        return False
+    siblings = element["parent"]["children"][:element["sibling_index"]]
+    if combinator == "+":
+        return bool(siblings) and _matches_from(siblings[-1], parts, i - 1)
+    return any(_matches_from(s, parts, i - 1) for s in siblings)
+
+
+def selector_matches(element: dict, parts: list) -> bool:
+    """Return True if the parsed selector matches element."""
+    return _matches_from(element, parts, len(parts) - 1)
+
+
+def _index_elements(elements: list[dict]) -> dict:
+    index = {"id": {}, "class": {}, "tag": {}}
+    for element in elements:
+        if element["id"]:
+            index["id"].setdefault(element["id"], []).append(element)
+        for cls in element["classes"]:
+            index["class"].setdefault(cls, []).append(element)
+        index["tag"].setdefault(element["tag"], []).append(element)
+    return index
+
+
+def _candidates(index: dict, elements: list[dict], compound: dict) -> list[dict]:
+    if compound["id"]:
+        return index["id"].get(compound["id"], [])
+    if compound["classes"]:
+        return index["class"].get(compound["classes"][0], [])
+    if compound["tag"]:
+        return index["tag"].get(compound["tag"], [])
+    return elements
+
+
+def collect_js_classes(scripts) -> set[str]:
+    """Return class names that JavaScript source adds to the DOM.
+
+    Looks for classList.add/toggle/replace arguments, className assignments
+    and class="..." inside markup strings (e.g. search results built with
+    innerHTML). Interpolated parts like ${...} are ignored.
+    """
+    classes = set()
+    for js in scripts:
+        values = []
+        for match in _JS_CLASS_LIST_RE.finditer(js):
+            values.extend(m.group(2) for m in _JS_STRING_RE.finditer(match.group(1)))
+        values.extend(m.group(2) for m in _JS_CLASS_NAME_RE.finditer(js))
+        values.extend(m.group(2) for m in _JS_CLASS_ATTR_RE.finditer(js))
+        for value in values:
+            classes.update(token for token in value.split() if _CLASS_NAME_RE.match(token))
+    return classes
+
+
+def is_safelisted(
+    selector: str,
+    safelist: tuple[str, ...] | list[str],
+    safe_classes: frozenset[str] = frozenset(),
+) -> bool:
+    """Return True if selector contains any safelisted token or uses a safe class.
+
+    safelist entries are hand-written and match as substrings. safe_classes
+    (collected from JS) match whole class names only, so "dark" keeps
+    ".dark .x" but not ".dark-mode" or ".darker".
+    """
+    if any(token in selector for token in safelist):
+        return True
+    return bool(safe_classes) and any(name in safe_classes for name in _SELECTOR_CLASS_RE.findall(selector))
+
+
+def match_page(
+    rules: list[dict],
+    document: dict,
+    fold: int = DEFAULT_FOLD,
+    layout_depth: int = DEFAULT_LAYOUT_DEPTH,
+    safelist: tuple[str, ...] | list[str] = DEFAULT_SAFELIST,
+    safe_classes: frozenset[str] = frozenset(),
+) -> tuple[set[str], set[str]]:
+    """Return (matched, critical) selector sets for one parsed page."""
+    elements = document["elements"]
+    index = _index_elements(elements)
+    max_depth = document["body_depth"] + layout_depth
+
+    matched = set()
+    critical = set()
+    for selector in set(iter_selectors(rules)):
+        if is_safelisted(selector, safelist, safe_classes):
+            matched.add(selector)
+            continue
+        parts = parse_selector(selector)
+        if parts is None:
+            # Unknown syntax: keep it rather than risk dropping a live rule.
+            matched.add(selector)
+            continue
+        for element in _candidates(index, elements, parts[-1][1]):
+            if selector_matches(element, parts):
+                matched.add(selector)
+                if element["index"] < fold or element["depth"] <= max_depth:
+                    critical.add(selector)
+                    break
+    return matched, critical
+
+
+# ---------------------------------------------------------------------------
+# Site processing
+# ---------------------------------------------------------------------------
+
+
+def classify_page(rel_path: Path, document: dict) -> str:
+    """Return the template type for a built page.
+
+    One of "home", "single", "vault", "search" or "list" (taxonomy and
+    section listings).
+    """
+    parts = rel_path.parts
+    if parts == ("index.html",) or (len(parts) == 3 and parts[0] == "page"):
+        return "home"
+    elements = document["elements"]
+    if any(e["id"] == "searchbox" for e in elements):
+        return "search"
+    if any("vault-page" in e["classes"] for e in elements):
+        return "vault"
+    body = next((e for e in elements if e["tag"] == "body"), None)
+    if body is not None and "list" in body["classes"]:
+        return "list"
+    return "single"
+
+
+def find_stylesheet_link(html: str, stylesheet: str = DEFAULT_STYLESHEET) -> tuple[str, str] | None:
+    """Return (link tag text, href) for the stylesheet whose filename starts with stylesheet."""
+    for match in _LINK_TAG_RE.finditer(html):
+        elements = parse_html(match.group(0))["elements"]
+        if not elements:
+            continue
+        attrs = elements[0]["attrs"]
+        href = attrs.get("href", "")
+        if "stylesheet" in attrs.get("rel", "").split() and href.rsplit("/", 1)[-1].startswith(stylesheet):
+            return match.group(0), href
+    return None
+
+
+def render_replacement(critical_css: str, deferred_href: str) -> str:
+    """Return the markup that replaces the render-blocking <link>."""
+    return (
+        f"<style {PROCESSED_MARKER}>{critical_css}</style>"
+        f"<link rel=preload href={deferred_href} as=style "
+        f"onload=\"this.onload=null;this.rel='stylesheet'\">"
+        f"<noscript><link rel=stylesheet href={deferred_href}></noscript>"
+    )
+
+
+def _deferred_href(href: str, page_type: str, css: str) -> str:
+    directory, _, filename = href.rpartition("/")
+    stem = filename.split(".", 1)[0]
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:10]
+    return f"{directory}/{stem}.{page_type}.{digest}.css"
+
+
+def process_site(
+    public_dir: Path,
+    fold: int = DEFAULT_FOLD,
+    layout_depth: int = DEFAULT_LAYOUT_DEPTH,
+    safelist: tuple[str, ...] | list[str] = DEFAULT_SAFELIST,
+    stylesheet: str = DEFAULT_STYLESHEET,
+    dry_run: bool = False,
+) -> dict:
+    """Extract critical CSS for every page under public_dir and rewrite it.
+
+    Pages already rewritten by an earlier run are skipped. Selectors using a
+    class name that the site's JavaScript adds are always kept.
+
+    Returns a report keyed by template type with page counts and byte sizes.
+    """
+    groups = {}
+    scripts = {p.read_text(encoding="utf-8", errors="replace") for p in public_dir.rglob("*.js")}
+    for path in sorted(public_dir.rglob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        scripts.update(m.group(1) for m in _SCRIPT_RE.finditer(html))
+        if PROCESSED_MARKER in html:
+            continue
+        link = find_stylesheet_link(html, stylesheet)
+        if link is None:
+            continue
+        document = parse_html(html)
+        page_type = classify_page(path.relative_to(public_dir), document)
+        groups.setdefault((page_type, link[1]), []).append((path, html, link[0], document))
+
+    js_classes = frozenset(collect_js_classes(scripts))
+    stylesheets = {}
+    report = {}
+    for (page_type, href), pages in sorted(groups.items()):
+        if href not in stylesheets:
+            css_path = public_dir / href.split("?", 1)[0].lstrip("/")
+            if not css_path.is_file():
+                print(f"Warning: stylesheet {href} not found in {public_dir} — skipping {page_type} pages.")
+                continue
+            source = css_path.read_text(encoding="utf-8")
+            stylesheets[href] = (source, parse_css(source))
+        source, rules = stylesheets[href]
+
+        matched = set()
+        critical = set()
+        for _, _, _, document in pages:
+            page_matched, page_critical = match_page(rules, document, fold, layout_depth, safelist, js_classes)
+            matched |= page_matched
+            critical |= page_critical
+
+        deferred_css = serialize_css(filter_rules(rules, matched, keep_at=True))
+        critical_css = serialize_css(filter_rules(rules, critical, keep_at=False))
+        deferred_href = _deferred_href(href, page_type, deferred_css)
+
+        if not dry_run:
+            (public_dir / deferred_href.lstrip("/")).write_text(deferred_css, encoding="utf-8")
+            replacement = render_replacement(critical_css, deferred_href)
+            for path, html, link_tag, _ in pages:
+                path.write_text(html.replace(link_tag, replacement, 1), encoding="utf-8")
+
+        original_bytes = len(source.encode("utf-8"))
+        deferred_bytes = len(deferred_css.encode("utf-8"))
+        report[page_type] = {
+            "pages": len(pages),
+            "stylesheet": href,
+            "deferred_stylesheet": deferred_href,
+            "original_bytes": original_bytes,
+            "deferred_bytes": deferred_bytes,
+            "critical_bytes": len(critical_css.encode("utf-8")),
+            "removed_bytes": original_bytes - deferred_bytes,
+        }
+    return report
+
+
+def format_report(report: dict) -> str:
+    """Format the per-template report as a plain-text table."""
+    header = f"{'Template':<10} {'Pages':>5} {'Original':>10} {'Deferred':>10} {'Critical':>10} {'Removed':>17}"
+    lines = [header, "-" * len(header)]
+    for page_type, row in sorted(report.items()):
+        pct = (100 * row["removed_bytes"] / row["original_bytes"]) if row["original_bytes"] else 0
+        lines.append(
+            f"{page_type:<10} {row['pages']:>5} {_kb(row['original_bytes']):>10} "
+            f"{_kb(row['deferred_bytes']):>10} {_kb(row['critical_bytes']):>10} "
+            f"{_kb(row['removed_bytes']):>9} ({pct:>3.0f}%)"
+        )
+    return "\n".join(lines)
+
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inline critical CSS and defer a purged per-template stylesheet in the built site."
+    )
+    parser.add_argument("public_dir", nargs="?", default="public", help="Hugo output directory (default: public)")
+    parser.add_argument(
+        "--fold",
+        type=int,
+        default=DEFAULT_FOLD,
+        metavar="N",
+        help=f"Elements in document order treated as above the fold (default: {DEFAULT_FOLD})",
+    )
+    parser.add_argument(
+        "--layout-depth",
+        type=int,
+        default=DEFAULT_LAYOUT_DEPTH,
+        metavar="N",
+        help=f"Wrappers this many levels below <body> are always critical (default: {DEFAULT_LAYOUT_DEPTH})",
+    )
+    parser.add_argument(
+        "--safelist",
+        nargs="*",
+        default=[],
+        metavar="TOKEN",
+        help="Extra selector substrings that must never be purged (e.g. a class added by JS)",
+    )
+    parser.add_argument(
+        "--stylesheet",
+        default=DEFAULT_STYLESHEET,
+        help=f"Filename prefix of the stylesheet to process (default: {DEFAULT_STYLESHEET})",
+    )
+    parser.add_argument("--report", metavar="FILE", help="Also write the report as JSON to FILE")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without rewriting any files")
+    args = parser.parse_args()
+
+    public_dir = Path(args.public_dir)
+    if not public_dir.is_dir():
+        print(f"Error: Output directory not found: {public_dir}")
+        print("Run `hugo --gc --minify` first.")
+        sys.exit(1)
+
+    report = process_site(
+        public_dir,
+        fold=args.fold,
+        layout_depth=args.layout_depth,
+        safelist=DEFAULT_SAFELIST + tuple(args.safelist),
+        stylesheet=args.stylesheet,
+        dry_run=args.dry_run,
+    )
+    if not report:
+        if any(PROCESSED_MARKER in p.read_text(encoding="utf-8") for p in public_dir.rglob("*.html")):
+            print(f"{public_dir} has already been processed — rebuild with hugo to run again.")
+            return
+        print(f"No pages referencing a '{args.stylesheet}*.css' stylesheet found in {public_dir}.")
+        sys.exit(1)
+
+    print(format_report(report))
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nReport written to {args.report}")
+    if args.dry_run:
+        print("\n(dry run — no files were changed)")
+
+
+if __name__ == "__main__":
+    main()
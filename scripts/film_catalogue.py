@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+film_catalogue.py — Local TMDB film catalogue for offline title resolution
+==========================================================================
+
+new_post.py needs a TMDB movie ID to fetch similar films. Rather than
+sending the first line of the post to TMDB's search endpoint and trusting
+the top result, this module builds a local SQLite full-text index of film
+titles and resolves the reviewed film from the post body with no network.
+
+Usage:
+    # Download the daily export from https://developer.themoviedb.org/docs/daily-id-exports
+    python scripts/film_catalogue.py build movie_ids_10_19_2026.json.gz
+    python scripts/film_catalogue.py lookup "Tron: Ares" --year 2025
+    python scripts/film_catalogue.py resolve path/to/body.txt
+
+Requirements:
+    - Python standard library only (SQLite with FTS5, which ships with CPython)
+
+The catalogue lives at .cache/film_catalogue.db (gitignored). The daily
+export carries id, original_title and popularity but no release year, so
+year is stored when a row provides one ("year" or "release_date") and is
+otherwise NULL — year hints then only break ties between equal titles.
+
+How a body is resolved:
+    1. Candidate titles are taken from *italic* / _italic_ mentions,
+       "Title (YYYY)" mentions and a short first line (a Google Doc title).
+       A candidate contained in a longer one (*Ares* in *Tron: Ares*) is
+       folded into it, and candidates are ranked by mention count, then by
+       how often their words recur in the body.
+    2. Each candidate is looked up in the FTS index (all words, then any
+       word) and the hits are re-scored on fuzzy title similarity, year
+       agreement and popularity.
+    3. The highest-ranked candidate with a close enough match wins, but is
+       only trusted ("confident") if the catalogue can tell it apart. A
+       candidate with a year needs a row with an agreeing year, since the
+       export stores original titles without years (a review of *Parasite*
+       (2019) must not match some other "Parasite"), and a title shared by
+       several rows needs the year to pick exactly one. Otherwise
+       new_post.py searches TMDB with that title and year instead.
+"""
+
+import argparse
+import gzip
+import json
+import math
+import re
+import sqlite3
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+
+DEFAULT_DB = Path(".cache") / "film_catalogue.db"
+MIN_SIMILARITY = 0.8
+MAX_CANDIDATES = 5
+FTS_LIMIT = 50
+_BATCH_SIZE = 10_000
+
+_SCHEMA = """
+CREATE TABLE films (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    year INTEGER,
+    popularity REAL NOT NULL DEFAULT 0
+);
+CREATE VIRTUAL TABLE films_fts USING fts5(
+    title,
+    content='films',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_ITALIC_RE = re.compile(r"(?<![*\w])\*(?!\*)([^*\n]+?)(?<!\s)\*(?![*\w])|(?<![_\w])_(?!_)([^_\n]+?)(?<!\s)_(?![_\w])")
+_YEAR_AFTER_RE = re.compile(r"\s*\((\d{4})\)")
+_TITLE_YEAR_RE = re.compile(r"((?:[A-Z0-9][\w'’:&!?.-]*\s){1,6})\((19\d\d|20\d\d)\)")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset({"a", "an", "and", "the", "of", "in", "on", "to", "for", "from", "at", "by", "with"})
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+
+def _read_export_rows(export_path: Path, include_adult: bool = False):
+    """Yield (id, title, year, popularity) from a TMDB daily ID export (JSONL, optionally gzipped)."""
+    opener = gzip.open if export_path.suffix == ".gz" else open
+    with opener(export_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("video") or (row.get("adult") and not include_adult):
+                continue
+            title = row.get("original_title") or row.get("title")
+            if not title or "id" not in row:
+                continue
+            year = row.get("year") or (row.get("release_date") or "")[:4]
+            yield (
+                int(row["id"]),
+                title,
+                int(year) if str(year).isdigit() else None,
+                float(row.get("popularity") or 0),
+            )
+
+
+def build_catalogue(export_path: Path, db_path: Path = DEFAULT_DB, include_adult: bool = False) -> int:
+    """Build the catalogue database from an export file. Returns the number of films.
+
+    The database is written to a temporary file and moved into place, so a
+    failed build never leaves a half-written catalogue behind.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        batch = []
+        count = 0
+        for row in _read_export_rows(export_path, include_adult):
+            batch.append(row)
+            if len(batch) >= _BATCH_SIZE:
+                conn.executemany("INSERT OR REPLACE INTO films VALUES (?, ?, ?, ?)", batch)
+                count += len(batch)
+                batch = []
+        conn.executemany("INSERT OR REPLACE INTO films VALUES (?, ?, ?, ?)", batch)
+        count += len(batch)
+        conn.execute("INSERT INTO films_fts(films_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO meta VALUES ('source', ?)", (export_path.name,))
+        conn.commit()
+    finally:
+        conn.close()
+    tmp_path.replace(db_path)
+    return count
+
+
+def open_catalogue(db_path: Path = DEFAULT_DB) -> sqlite3.Connection | None:
+    """Open the catalogue read-only, or return None if it has not been built."""
+    if not db_path.is_file():
+        return None
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+
+def _normalise(title: str) -> str:
+    return " ".join(_WORD_RE.findall(title.lower()))
+
+
+def _fts_query(words: list[str], operator: str) -> str:
+    return f" {operator} ".join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+def score_match(query: str, year: int | None, title: str, film_year: int | None, popularity: float) -> tuple[float, float]:
+    """Return (similarity, score) for a catalogue row against a query title.
+
+    similarity is the fuzzy title ratio alone; score adds a year bonus or
+    penalty and a small log-scaled popularity bonus for ranking.
+    """
+    similarity = SequenceMatcher(None, _normalise(query), _normalise(title)).ratio()
+    score = similarity + 0.1 * min(1.0, math.log10(1 + max(popularity, 0)) / 2)
+    if year and film_year:
+        gap = abs(year - film_year)
+        score += 0.1 if gap == 0 else 0.05 if gap == 1 else -0.15
+    return similarity, score
+
+
+def lookup_title(conn: sqlite3.Connection, title: str, year: int | None = None, limit: int = 5) -> list[dict]:
+    """Return the best catalogue matches for title, highest score first.
+
+    Each match is {"id", "title", "year", "popularity", "similarity", "score"}.
+    """
+    words = _WORD_RE.findall(title.lower())
+    if not words:
+        return []
+    rows = []
+    for operator in ("AND", "OR"):
+        rows = conn.execute(
+            "SELECT f.id, f.title, f.year, f.popularity FROM films_fts "
+            "JOIN films f ON f.id = films_fts.rowid "
+            "WHERE films_fts MATCH ? ORDER BY bm25(films_fts) LIMIT ?",
+            (_fts_query(words, operator), FTS_LIMIT),
+        ).fetchall()
+        if rows:
+            break
+    matches = []
+    for row in rows:
+        similarity, score = score_match(title, year, row["title"], row["year"], row["popularity"])
+        matches.append({
+            "id": row["id"],
+            "title": row["title"],
+            "year": row["year"],
+            "popularity": row["popularity"],
+            "similarity": round(similarity, 4),
+            "score": round(score, 4),
+        })
+    matches.sort(key=lambda m: m["score"], reverse=True)
+    return matches[:limit]
+
+
+# ---------------------------------------------------------------------------
+# Resolving a post body
+# ---------------------------------------------------------------------------
+
+
+def _looks_like_title(text: str) -> bool:
+    words = text.split()
+    if not words or len(words) > 8 or len(text) > 60:
+        return False
+    if not (text[0].isupper() or text[0].isdigit()):
+        return False
+    if any(c in text for c in "()[]/"):
+        return False
+    return not text.endswith((".", ","))
+
+
+def extract_title_candidates(body: str) -> list[dict]:
+    """Return likely film titles mentioned in body, most likely first.
+
+    Each candidate is {"title", "year", "mentions", "echo", "first"}: echo
+    counts body occurrences of the title's distinctive words and first is the
+    character offset of the first mention.
+    """
+    found = {}
+
+    def add(title: str, year: int | None, pos: int, weight: int = 1) -> None:
+        title = title.strip(" \t:,;")
+        if not _looks_like_title(title):
+            return
+        key = _normalise(title)
+        entry = found.setdefault(key, {"title": title, "year": None, "mentions": 0, "first": pos})
+        entry["mentions"] += weight
+        entry["year"] = entry["year"] or year
+        entry["first"] = min(entry["first"], pos)
+
+    first_line = body.strip().split("\n", 1)[0].strip().lstrip("#").strip()
+    if first_line and len(body.strip()) > len(first_line):
+        add(first_line, None, 0, weight=2)
+
+    for match in _ITALIC_RE.finditer(body):
+        year_match = _YEAR_AFTER_RE.match(body, match.end())
+        add(match.group(1) or match.group(2), int(year_match.group(1)) if year_match else None, match.start())
+    for match in _TITLE_YEAR_RE.finditer(body):
+        add(match.group(1), int(match.group(2)), match.start())
+
+    # Fold short mentions into the longer title that contains them
+    # (*Ares* and *Tron* both count towards *Tron: Ares*).
+    candidates = sorted(found.values(), key=lambda c: len(c["title"]), reverse=True)
+    folded = []
+    for candidate in sorted(candidates, key=lambda c: len(c["title"])):
+        pattern = re.compile(rf"\b{re.escape(_normalise(candidate['title']))}\b")
+        containers = [c for c in candidates if c is not candidate and len(c["title"]) > len(candidate["title"])
+                      and pattern.search(_normalise(c["title"]))]
+        if containers:
+            best = max(containers, key=lambda c: (c["mentions"], -c["first"]))
+            best["mentions"] += candidate["mentions"]
+            best["year"] = best["year"] or candidate["year"]
+            folded.append(candidate)
+    result = [c for c in candidates if not any(c is f for f in folded)]
+
+    # Break ties on how often the title's distinctive words recur in the body:
+    # a review keeps saying "Predator" and "Badlands", not "Prey".
+    body_words = _WORD_RE.findall(body.lower())
+    for c in result:
+        c["echo"] = sum(body_words.count(w) for w in set(_WORD_RE.findall(c["title"].lower())) - _STOPWORDS)
+    result.sort(key=lambda c: (-c["mentions"], -c["echo"], c["first"]))
+    return result
+
+
+def is_confident(matches: list[dict], year: int | None) -> bool:
+    """Return True if the top lookup_title() match can be trusted for a title and year.
+
+    Not confident when the query has a year the top row cannot confirm (no
+    year, or more than a year off), or when several rows share the top
+    row's normalised title and the year does not single out one of them.
+    """
+    top = matches[0]
+    if year and (top["year"] is None or abs(top["year"] - year) > 1):
+        return False
+    same_title = [m for m in matches if _normalise(m["title"]) == _normalise(top["title"])]
+    if len(same_title) > 1:
+        return bool(year) and sum(1 for m in same_title if m["year"] == year) == 1
+    return True
+
+
+def resolve_body(conn: sqlite3.Connection, body: str, min_similarity: float = MIN_SIMILARITY) -> dict | None:
+    """Return the catalogue match for the film a post body reviews, or None.
+
+    The returned dict is a lookup_title() match plus "candidate" and
+    "candidate_year" (the title text and year it was resolved from) and
+    "confident" (see is_confident). Callers should only use the ID of a
+    confident match and otherwise search by candidate and candidate_year.
+    """
+    for candidate in extract_title_candidates(body)[:MAX_CANDIDATES]:
+        matches = lookup_title(conn, candidate["title"], candidate["year"], limit=FTS_LIMIT)
+        if matches and matches[0]["similarity"] >= min_similarity:
+            return {
+                **matches[0],
+                "candidate": candidate["title"],
+                "candidate_year": candidate["year"],
+                "confident": is_confident(matches, candidate["year"]),
+            }
+    return None
+
+
+def resolve_film(body: str, db_path: Path = DEFAULT_DB) -> dict | None:
+    """Resolve the reviewed film from body using the catalogue at db_path.
+
+    Returns None (without error) if the catalogue has not been built.
+    """
+    conn = open_catalogue(db_path)
+    if conn is None:
+        return None
+    try:
+        return resolve_body(conn, body)
+    except sqlite3.DatabaseError as e:
+        print(f"  Local film catalogue unreadable ({e}) — rebuild it with film_catalogue.py build.")
+        return None
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the local TMDB film catalogue.")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help=f"Catalogue database (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the catalogue from a TMDB daily ID export")
+    build.add_argument("export", help="Path to movie_ids_MM_DD_YYYY.json.gz")
+    build.add_argument("--include-adult", action="store_true", help="Keep rows flagged adult")
+
+    lookup = sub.add_parser("lookup", help="Look up a title")
+    lookup.add_argument("title")
+    lookup.add_argument("--year", type=int, default=None)
+
+    resolve = sub.add_parser("resolve", help="Resolve the reviewed film from a post body file")
+    resolve.add_argument("body", help="Path to a plain text or Markdown post body")
+
+    args = parser.parse_args()
+    db_path = Path(args.db)
+
+    if args.command == "build":
+        export_path = Path(args.export)
+        if not export_path.is_file():
+            print(f"Error: Export file not found: {export_path}")
+            sys.exit(1)
+        print(f"Building {db_path} from {export_path.name}...")
+        count = build_catalogue(export_path, db_path, args.include_adult)
+        print(f"Indexed {count:,} films.")
+        return
+
+    conn = open_catalogue(db_path)
+    if conn is None:
+        print(f"Error: Catalogue not found at {db_path}. Run the build command first.")
+        sys.exit(1)
+
+    if args.command == "lookup":
+        matches = lookup_title(conn, args.title, args.year)
+        if not matches:
+            print("No matches.")
+        for m in matches:
+            print(f"  {m['id']:>8}  {m['title']} ({m['year'] or '?'})  "
+                  f"similarity {m['similarity']:.2f}  popularity {m['popularity']:.1f}")
+        return
+
+    body_path = Path(args.body)
+    if not body_path.is_file():
+        print(f"Error: Body file not found: {body_path}")
+        sys.exit(1)
+    body = body_path.read_text(encoding="utf-8")
+    for c in extract_title_candidates(body)[:MAX_CANDIDATES]:
+        print(f"  candidate: {c['title']!r} ({c['year'] or '?'}) — {c['mentions']} mention(s)")
+    match = resolve_body(conn, body)
+    if match and match["confident"]:
+        print(f"Resolved: {match['title']} ({match['year'] or '?'}) — TMDB ID {match['id']}")
+    elif match:
+        print(f"Ambiguous: {match['candidate']!r} ({match['candidate_year'] or '?'}) matches "
+              f"{match['title']} ({match['year'] or '?'}) but the catalogue cannot confirm it — "
+              "new_post.py will search TMDB for that title and year.")
+        sys.exit(1)
+    else:
+        print("No confident match — new_post.py will fall back to TMDB search.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+near_duplicates.py — Near-duplicate draft detection against the post archive
+============================================================================
+
+Catches drafts that are really a re-submission or light rewrite of an
+existing review in content/posts/ before new_post.py spends TMDB and Claude
+calls on them.
+
+Usage:
+    python scripts/near_duplicates.py check path/to/body.txt [--threshold 0.5]
+    python scripts/near_duplicates.py update      # refresh the signature index
+
+Requirements:
+    - Python standard library only
+
+How it works:
+    Each post body is reduced to lowercase word 3-shingles and summarised
+    as a 128-value MinHash signature. Signatures are cached in
+    .cache/near_duplicates.json (gitignored) and refreshed incrementally:
+    a post is re-hashed only when its size or mtime changes, and
+    re-signed only when its text actually changed.
+
+    A draft is compared with every cached signature (128 integers per post,
+    so thousands of posts take well under a second). Two scores are
+    estimated per post:
+        similarity  — Jaccard overlap of the two shingle sets
+        containment — share of the existing post's shingles found in the
+                      draft, which stays high when old text is reused and
+                      extended (a revisit started from the original review)
+    A post is flagged when either score reaches the threshold.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+from pathlib import Path
+
+
+POSTS_DIR = Path("content") / "posts"
+INDEX_PATH = Path(".cache") / "near_duplicates.json"
+DEFAULT_THRESHOLD = 0.5
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+INDEX_VERSION = 1
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20251005)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+_FRONT_MATTER_RE = re.compile(r"\A---\s*\n.*?\n---\s*\n", re.DOTALL)
+_TITLE_RE = re.compile(r'^title:\s*"?(.*?)"?\s*$', re.MULTILINE)
+_SHORTCODE_RE = re.compile(r"\{\{[<%].*?[>%]\}\}", re.DOTALL)
+_MD_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def split_post(markdown: str) -> tuple[str, str]:
+    """Return (title, body) from a post's index.md, dropping the front matter."""
+    match = _FRONT_MATTER_RE.match(markdown)
+    if not match:
+        return "", markdown
+    title = _TITLE_RE.search(match.group(0))
+    return (title.group(1).replace('\\"', '"') if title else ""), markdown[match.end():]
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> set[int]:
+    """Return 64-bit hashes of the text's lowercase word shingles.
+
+    Markdown links keep their text; Hugo shortcodes (inline figures) are dropped.
+    """
+    text = _MD_LINK_RE.sub(r"\1", _SHORTCODE_RE.sub(" ", text))
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(max(len(words) - size + 1, 1))
+    }
+
+
+def minhash(hashes: set[int]) -> list[int]:
+    """Return the MinHash signature of a set of shingle hashes."""
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_jaccard(sig_a: list[int], sig_b: list[int]) -> float:
+    """Estimate Jaccard similarity from two signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def estimate_containment(jaccard: float, draft_size: int, post_size: int) -> float:
+    """Estimate the share of the post's shingles that appear in the draft.
+
+    Derived from |A∩B| = J(|A|+|B|)/(1+J).
+    """
+    if not post_size:
+        return 0.0
+    intersection = jaccard * (draft_size + post_size) / (1 + jaccard)
+    return min(1.0, intersection / post_size)
+
+
+# ---------------------------------------------------------------------------
+# Signature index
+# ---------------------------------------------------------------------------
+
+
+def _empty_index() -> dict:
+    return {"version": INDEX_VERSION, "num_perm": NUM_PERM, "shingle_size": SHINGLE_SIZE, "posts": {}}
+
+
+def load_index(index_path: Path = INDEX_PATH) -> dict:
+    """Load the signature index, or return an empty one if missing or stale."""
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return _empty_index()
+    if (index.get("version"), index.get("num_perm"), index.get("shingle_size")) != (
+        INDEX_VERSION, NUM_PERM, SHINGLE_SIZE
+    ):
+        return _empty_index()
+    return index
+
+
+def update_index(posts_dir: Path = POSTS_DIR, index_path: Path = INDEX_PATH) -> tuple[dict, int]:
+    """Bring the index in line with posts_dir and save it if anything changed.
+
+    Returns (index, number of posts re-signed).
+    """
+    index = load_index(index_path)
+    posts = index["posts"]
+    seen = set()
+    resigned = 0
+    changed = False
+
+    for path in sorted(posts_dir.glob("*/index.md")):
+        key = path.relative_to(posts_dir).parent.as_posix()
+        seen.add(key)
+        stat = path.stat()
+        entry = posts.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            continue
+        markdown = path.read_text(encoding="utf-8")
+        digest = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+        changed = True
+        if entry and entry["sha256"] == digest:
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            continue
+        title, body = split_post(markdown)
+        hashes = shingle_hashes(body)
+        posts[key] = {
+            "title": title,
+            "sha256": digest,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "shingles": len(hashes),
+            "signature": minhash(hashes),
+        }
+        resigned += 1
+
+    for key in set(posts) - seen:
+        del posts[key]
+        changed = True
+
+    if changed:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        # Per-writer temp name: watch mode may update the index from several threads at once
+        tmp = index_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, index_path)
+    return index, resigned
+
+
+def find_near_duplicates(body: str, index: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Return indexed posts that overlap body at or above threshold, closest first.
+
+    Each match is {"post", "title", "similarity", "containment"}.
+    """
+    hashes = shingle_hashes(body)
+    if not hashes:
+        return []
+    signature = minhash(hashes)
+    matches = []
+    for key, entry in index["posts"].items():
+        jaccard = estimate_jaccard(signature, entry["signature"])
+        containment = estimate_containment(jaccard, len(hashes), entry["shingles"])
+        if max(jaccard, containment) >= threshold:
+            matches.append({
+                "post": key,
+                "title": entry["title"],
+                "similarity": round(jaccard, 3),
+                "containment": round(containment, 3),
+            })
+    matches.sort(key=lambda m: max(m["similarity"], m["containment"]), reverse=True)
+    return matches
+
+
+def check_draft(
+    body: str,
+    posts_dir: Path = POSTS_DIR,
+    index_path: Path = INDEX_PATH,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict]:
+    """Refresh the index and return near-duplicates of body (empty if no archive)."""
+    if not posts_dir.is_dir():
+        return []
+    index, _ = update_index(posts_dir, index_path)
+    return find_near_duplicates(body, index, threshold)
+
+
+def format_matches(matches: list[dict]) -> str:
+    """Format near-duplicate matches for the terminal."""
+    return "\n".join(
+        f"  - {m['post']}  \"{m['title']}\"  "
+        f"(similarity {m['similarity']:.0%}, {m['containment']:.0%} of it reused)"
+        for m in matches
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect drafts that duplicate an existing post.")
+    parser.add_argument("--posts", default=str(POSTS_DIR), help=f"Posts directory (default: {POSTS_DIR})")
+    parser.add_argument("--index", default=str(INDEX_PATH), help=f"Signature index (default: {INDEX_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check = sub.add_parser("check", help="Check a draft against the archive")
+    check.add_argument("body", help="Path to the draft body (plain text or Markdown)")
+    check.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Flag posts whose similarity or containment reaches this (default: {DEFAULT_THRESHOLD})",
+    )
+    sub.add_parser("update", help="Refresh the signature index")
+    args = parser.parse_args()
+
+    posts_dir = Path(args.posts)
+    if not posts_dir.is_dir():
+        print(f"Error: Posts directory not found: {posts_dir}")
+        sys.exit(1)
+
+    if args.command == "update":
+        index, resigned = update_index(posts_dir, Path(args.index))
+        print(f"Indexed {len(index['posts'])} posts ({resigned} re-signed).")
+        return
+
+    body_path = Path(args.body)
+    if not body_path.is_file():
+        print(f"Error: Body file not found: {body_path}")
+        sys.exit(1)
+    matches = check_draft(body_path.read_text(encoding="utf-8"), posts_dir, Path(args.index), args.threshold)
+    if not matches:
+        print("No near-duplicates found.")
+        return
+    print("Possible duplicate of:")
+    print(format_matches(matches))
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
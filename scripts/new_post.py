@@ -8,15 +8,21 @@ Claude API and formatting the post body as Markdown.
 
 Usage:
     python scripts/new_post.py <body.txt|google-docs-url> <cover_image> [secondary_image ...]
+    python scripts/new_post.py --watch <drafts_dir> [--debounce SECONDS]
+    python scripts/new_post.py --stats [--since DAYS]
 
 Requirements:
     - pip install -r scripts/requirements.txt
     - Set the ANTHROPIC_API_KEY environment variable
+    - Optional: build the local film catalogue (scripts/film_catalogue.py) so
+      the reviewed film is identified offline instead of via TMDB search
     - For Google Docs URLs: place credentials.json in the project root
       (see README for Google Cloud setup instructions)
 
 The script:
-    1. Reads the plain text body from the provided file or Google Docs URL
+    1. Reads the plain text body from the provided file or Google Docs URL,
+       and warns if it closely matches a post already in content/posts/
+       (see near_duplicates.py; --allow-duplicate skips the check)
     2. Calls the Claude API to infer front matter (title, slug, description,
        summary, tags, review_type, rating, spoiler, refraction_quote, genre_lineage)
     3. Prints the inferred front matter for interactive review
@@ -25,18 +31,42 @@ The script:
     6. User manually moves to content/posts/ when satisfied
 
 The staging/ directory is gitignored and never committed directly.
+
+Watch mode (--watch <drafts_dir>) runs steps 1–2 ahead of time: it polls the
+drafts folder for .txt/.md files added or edited since it started, waits
+until a draft has been left alone for --debounce seconds (five minutes by
+default, since each pre-warm is a paid Claude call), then runs TMDB
+enrichment and front matter generation in the background and caches the
+result under .cache/drafts/ (keyed by the draft text). A later interactive
+run on the same text skips straight to the confirm prompt; an interactive
+run that gets there first caches its own result, so the watcher skips the
+draft. If a draft changes while its pre-warm is in flight, that work is
+cancelled.
+
+Every run appends one telemetry record (stage timings, TMDB outcome, Claude
+token usage and estimated cost) to .cache/telemetry.jsonl; --stats
+summarises them (see telemetry.py).
 """
 
 import argparse
+import atexit
+import hashlib
 import json
 import os
 import shutil
 import sys
+import threading
+import time
 import urllib.parse
 import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 
+from film_catalogue import extract_title_candidates, resolve_film
+from near_duplicates import check_draft, format_matches
+from telemetry import RunTelemetry, format_stats, load_runs, stage, summarise_runs
+
 try:
     import anthropic
 except ImportError:
@@ -45,6 +75,14 @@ except ImportError:
     sys.exit(1)
 
 
+CLAUDE_MODEL = "claude-sonnet-4-6"
+
+DRAFT_CACHE_DIR = Path(".cache") / "drafts"
+WATCH_EXTENSIONS = (".txt", ".md")
+WATCH_POLL_SECONDS = 1.0
+# Each pre-warm is a paid Claude call, so only drafts left alone this long count as settled.
+WATCH_DEBOUNCE_SECONDS = 300.0
+
 FRONT_MATTER_PROMPT = """You are a metadata generator for a film review blog called "Reel Refractions".
 Given the blog post text below, generate Hugo-compatible front matter in JSON format with these fields:
 
@@ -232,24 +270,109 @@ def build_tmdb_context(similar_movies: list[dict]) -> str:
     )
 
 
-def generate_front_matter(body: str, api_key: str, tmdb_context: str = "") -> dict:
+class PrewarmCancelled(Exception):
+    """Raised inside a watch-mode pre-warm when its draft changed mid-flight."""
+
+
+def _check_cancelled(cancel: threading.Event | None) -> None:
+    if cancel is not None and cancel.is_set():
+        raise PrewarmCancelled()
+
+
+def fetch_tmdb_context(
+    body: str,
+    tmdb_id: int | None,
+    tmdb_api_key: str | None,
+    cancel: threading.Event | None = None,
+    telemetry: RunTelemetry | None = None,
+) -> str:
+    """Look up the film on TMDB and return the similar-movies prompt block.
+
+    The film is resolved from the local catalogue when one has been built
+    (see film_catalogue.py); TMDB's search endpoint is only the fallback.
+    Returns "" when TMDB_API_KEY is unset or nothing useful is found.
+    Raises PrewarmCancelled between network calls if cancel is set.
+    """
+    if not tmdb_api_key:
+        print("\n(TMDB_API_KEY not set — genre_lineage will be generated from post text alone.)")
+        return ""
+
+    movie_id = tmdb_id
+    resolution = "tmdb_id"
+    match = None
+    if movie_id is None:
+        with stage(telemetry, "catalogue") as st:
+            match = resolve_film(body)
+            st["status"] = "not_found" if not match else "ok" if match["confident"] else "ambiguous"
+        if match and match["confident"]:
+            print(f"\nMatched film in local catalogue: {match['title']} "
+                  f"({match['year'] or '?'}) — TMDB ID {match['id']}")
+            movie_id = match["id"]
+            resolution = "catalogue"
+    if movie_id is None:
+        # Fall back to TMDB search with the title the catalogue could not
+        # pin down, the likeliest title in the body, or its first line
+        candidates = extract_title_candidates(body)
+        if match:
+            query, year = match["candidate"], str(match["candidate_year"] or "")
+        elif candidates:
+            query, year = candidates[0]["title"], str(candidates[0]["year"] or "")
+        else:
+            query, year = body.strip().split("\n")[0][:80], ""
+        print(f"\nSearching TMDB for: {query!r}...")
+        with stage(telemetry, "tmdb_search") as st:
+            movie_id = search_tmdb(query, year, tmdb_api_key)
+            st["status"] = "ok" if movie_id else "not_found"
+        resolution = "search"
+        _check_cancelled(cancel)
+    if telemetry is not None:
+        telemetry.set(film_resolution=resolution, tmdb_found=bool(movie_id))
+    if not movie_id:
+        print("  Could not find film on TMDB — proceeding without TMDB context.")
+        return ""
+
+    print(f"  Fetching similar movies for TMDB ID {movie_id}...")
+    with stage(telemetry, "tmdb_similar") as st:
+        similar = fetch_similar_movies(movie_id, tmdb_api_key)
+        st["status"] = "ok" if similar else "empty"
+    if telemetry is not None:
+        telemetry.set(similar_count=len(similar))
+    _check_cancelled(cancel)
+    if not similar:
+        print("  No similar movies found on TMDB.")
+        return ""
+    print(f"  Found {len(similar)} similar films from TMDB.")
+    return build_tmdb_context(similar)
+
+
+def generate_front_matter(
+    body: str,
+    api_key: str,
+    tmdb_context: str = "",
+    telemetry: RunTelemetry | None = None,
+) -> dict:
     """Call Claude API to generate front matter from post body."""
     client = anthropic.Anthropic(api_key=api_key)
-
-    message = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=1536,
-        messages=[
-            {
-                "role": "user",
-                "content": FRONT_MATTER_PROMPT.format(
-                    body=body[:8000],
-                    tmdb_context=tmdb_context,
-                ),
-            }
-        ],
+    prompt = FRONT_MATTER_PROMPT.format(
+        body=body[:8000],
+        tmdb_context=tmdb_context,
     )
 
+    with stage(telemetry, "claude"):
+        message = client.messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=1536,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+        )
+    if telemetry is not None:
+        telemetry.set(prompt_chars=len(prompt), body_truncated=len(body) > 8000)
+        telemetry.set_usage(CLAUDE_MODEL, message.usage)
+
     response_text = message.content[0].text.strip()
 
     # Strip markdown fences if present
@@ -349,15 +472,216 @@ def format_body(body: str, secondary_images: list[str]) -> str:
     return "\n\n".join(result)
 
 
+def draft_cache_key(body: str, tmdb_id: int | None, use_tmdb: bool) -> str:
+    """Return the cache key for a draft's pre-warmed front matter.
+
+    Covers everything that changes the generated result: the text, the
+    TMDB inputs, the model and the prompt itself.
+    """
+    h = hashlib.sha256()
+    for part in (CLAUDE_MODEL, FRONT_MATTER_PROMPT, str(tmdb_id), str(use_tmdb), body.strip()):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def load_cached_draft(body: str, tmdb_id: int | None, use_tmdb: bool, cache_dir: Path = DRAFT_CACHE_DIR) -> dict | None:
+    """Return the pre-warmed entry for this draft text, or None on a miss."""
+    path = cache_dir / f"{draft_cache_key(body, tmdb_id, use_tmdb)}.json"
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return entry if isinstance(entry.get("meta"), dict) else None
+
+
+def save_cached_draft(
+    body: str,
+    tmdb_id: int | None,
+    use_tmdb: bool,
+    tmdb_context: str,
+    meta: dict,
+    source: str = "",
+    cache_dir: Path = DRAFT_CACHE_DIR,
+) -> Path:
+    """Write a pre-warmed entry atomically and return its path."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{draft_cache_key(body, tmdb_id, use_tmdb)}.json"
+    entry = {"source": source, "tmdb_context": tmdb_context, "meta": meta}
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(entry, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def prewarm_draft(
+    path: Path,
+    api_key: str,
+    tmdb_api_key: str | None,
+    cancel: threading.Event | None = None,
+    cache_dir: Path = DRAFT_CACHE_DIR,
+) -> bool:
+    """Run TMDB enrichment and front matter generation for one draft and cache it.
+
+    Returns True if a new cache entry was written, False if the draft was
+    already warm, vanished, duplicates an existing post, was cancelled or
+    generation failed.
+    """
+    try:
+        body = path.read_text(encoding="utf-8")
+    except OSError:
+        return False
+    if not body.strip():
+        return False
+    use_tmdb = bool(tmdb_api_key)
+    if load_cached_draft(body, None, use_tmdb, cache_dir):
+        print(f"[watch] {path.name}: already warm.")
+        return False
+
+    duplicates = check_draft(body, index_path=cache_dir.parent / "near_duplicates.json")
+    if duplicates:
+        print(f"[watch] {path.name}: skipped — closely matches {duplicates[0]['post']}.")
+        return False
+
+    print(f"[watch] {path.name}: pre-warming...")
+    telemetry = RunTelemetry("prewarm", log_path=cache_dir.parent / "telemetry.jsonl")
+    telemetry.set(body_chars=len(body))
+    try:
+        tmdb_context = fetch_tmdb_context(body, None, tmdb_api_key, cancel, telemetry)
+        _check_cancelled(cancel)
+        meta = generate_front_matter(body, api_key, tmdb_context=tmdb_context, telemetry=telemetry)
+        _check_cancelled(cancel)
+    except PrewarmCancelled:
+        print(f"[watch] {path.name}: changed mid-flight — discarded.")
+        telemetry.finish("cancelled")
+        return False
+    except (json.JSONDecodeError, anthropic.APIError) as e:
+        print(f"[watch] {path.name}: front matter generation failed: {e}")
+        telemetry.finish("error")
+        return False
+
+    save_cached_draft(body, None, use_tmdb, tmdb_context, meta, source=str(path), cache_dir=cache_dir)
+    telemetry.finish("cached")
+    print(f"[watch] {path.name}: ready — \"{meta.get('title', '')}\"")
+    return True
+
+
+class DraftWatcher:
+    """Poll a drafts folder and report drafts whose edits have settled.
+
+    A draft counts as changed only when its text changes (not just its
+    mtime), so re-saving an unchanged file does not restart its pre-warm.
+    Drafts already in the folder when the watcher starts are baselined, not
+    reported: only drafts added or edited after startup are pre-warmed.
+    """
+
+    def __init__(self, directory: Path, debounce: float = WATCH_DEBOUNCE_SECONDS):
+        self.directory = directory
+        self.debounce = debounce
+        self._stat = self._scan()    # path -> (mtime_ns, size) at last poll
+        self._digest = {}            # path -> sha256 of the text at last change
+        self._pending = {}           # path -> time of last change not yet dispatched
+        for path in list(self._stat):
+            try:
+                self._digest[path] = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                del self._stat[path]
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        found = {}
+        for path in self.directory.iterdir():
+            if path.suffix.lower() in WATCH_EXTENSIONS and not path.name.startswith("."):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                found[path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def poll(self, now: float) -> tuple[list[Path], list[Path]]:
+        """Return (changed, ready) drafts for this poll.
+
+        changed: drafts whose text changed since the previous poll.
+        ready:   drafts that have not changed for the debounce interval.
+        """
+        changed = []
+        current = self._scan()
+        for path, stat in current.items():
+            if self._stat.get(path) == stat:
+                continue
+            self._stat[path] = stat
+            try:
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                continue
+            if self._digest.get(path) != digest:
+                self._digest[path] = digest
+                self._pending[path] = now
+                changed.append(path)
+        for path in set(self._stat) - set(current):
+            self._stat.pop(path, None)
+            self._digest.pop(path, None)
+            self._pending.pop(path, None)
+
+        ready = [p for p, t in self._pending.items() if now - t >= self.debounce]
+        for path in ready:
+            del self._pending[path]
+        return sorted(changed), sorted(ready)
+
+
+def _report_prewarm_failure(name: str, future: Future) -> None:
+    """Print an exception that escaped prewarm_draft, which would otherwise be lost with its future."""
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        print(f"[watch] {name}: pre-warm failed: {type(error).__name__}: {error}")
+
+
+def watch_drafts(
+    directory: Path,
+    api_key: str,
+    tmdb_api_key: str | None,
+    poll_seconds: float = WATCH_POLL_SECONDS,
+    debounce: float = WATCH_DEBOUNCE_SECONDS,
+) -> None:
+    """Watch a drafts folder and pre-warm drafts in the background until Ctrl-C."""
+    watcher = DraftWatcher(directory, debounce)
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prewarm")
+    in_flight = {}  # path -> (future, cancel event)
+
+    print(f"Watching {directory}/ for {', '.join(WATCH_EXTENSIONS)} drafts (Ctrl-C to stop)...")
+    try:
+        while True:
+            changed, ready = watcher.poll(time.monotonic())
+            for path in changed:
+                job = in_flight.pop(path, None)
+                if job and not job[0].done():
+                    job[1].set()
+            for path in ready:
+                cancel = threading.Event()
+                future = executor.submit(prewarm_draft, path, api_key, tmdb_api_key, cancel)
+                future.add_done_callback(lambda f, name=path.name: _report_prewarm_failure(name, f))
+                in_flight[path] = (future, cancel)
+            in_flight = {p: job for p, job in in_flight.items() if not job[0].done()}
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        for _, cancel in in_flight.values():
+            cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        print("\nStopped watching.")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Create a new Reel Refractions blog post with AI-generated front matter."
     )
     parser.add_argument(
         "body",
+        nargs="?",
         help="Path to plain text file OR a Google Docs URL (https://docs.google.com/document/d/...)",
     )
-    parser.add_argument("cover", help="Path to cover/hero image")
+    parser.add_argument("cover", nargs="?", help="Path to cover/hero image")
     parser.add_argument("images", nargs="*", help="Paths to secondary inline images")
     parser.add_argument("--letterboxd", default="", help="Letterboxd URL for this film")
     parser.add_argument(
@@ -369,8 +693,54 @@ def main():
              "Find it at themoviedb.org (e.g. 533533 for Tron: Ares). "
              "Requires TMDB_API_KEY env var.",
     )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Watch a drafts folder and pre-warm TMDB lookups and front matter in the background, "
+             "so the later interactive run for each draft opens the confirm prompt instantly.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=WATCH_DEBOUNCE_SECONDS,
+        metavar="SECONDS",
+        help="With --watch, how long a draft must stay unchanged before it is pre-warmed "
+             f"(default: {WATCH_DEBOUNCE_SECONDS:.0f}). Each pre-warm is a paid Claude call.",
+    )
+    parser.add_argument(
+        "--allow-duplicate",
+        action="store_true",
+        help="Skip the near-duplicate check against existing posts.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Summarise logged runs (stage timings, token usage, cost, failure rates) and exit.",
+    )
+    parser.add_argument(
+        "--since",
+        type=float,
+        default=None,
+        metavar="DAYS",
+        help="With --stats, only include runs from the last DAYS days.",
+    )
     args = parser.parse_args()
 
+    if args.stats:
+        print(format_stats(summarise_runs(load_runs(since_days=args.since))))
+        return
+
+    if args.watch:
+        watch_dir = Path(args.watch)
+        if not watch_dir.is_dir():
+            print(f"Error: Drafts folder not found: {watch_dir}")
+            sys.exit(1)
+        watch_drafts(watch_dir, get_api_key(), get_tmdb_api_key(), debounce=args.debounce)
+        return
+
+    if not args.body or not args.cover:
+        parser.error("the following arguments are required: body, cover")
+
     # Validate inputs
     cover_path = Path(args.cover)
 
@@ -386,49 +756,57 @@ def main():
             sys.exit(1)
         secondary_paths.append(p)
 
+    # One telemetry record per run, written on every exit path
+    telemetry = RunTelemetry("interactive")
+    atexit.register(telemetry.finish)
+
     # Fetch body from Google Docs URL or read from local file
     if is_google_docs_url(args.body):
         print("Fetching document from Google Docs...")
-        body = fetch_google_doc(args.body)
+        with telemetry.stage("docs_fetch"):
+            body = fetch_google_doc(args.body)
     else:
         body_path = Path(args.body)
         if not body_path.is_file():
             print(f"Error: Body file not found: {body_path}")
             sys.exit(1)
         body = body_path.read_text(encoding="utf-8")
+    telemetry.set(source="google_doc" if is_google_docs_url(args.body) else "file", body_chars=len(body))
+
+    # Catch re-submissions and light rewrites before spending API calls
+    if not args.allow_duplicate:
+        with telemetry.stage("duplicate_check"):
+            duplicates = check_draft(body)
+        if duplicates:
+            telemetry.set(duplicate_of=duplicates[0]["post"])
+            print("\nThis draft closely matches existing post(s):")
+            print(format_matches(duplicates))
+            if input("Continue anyway? [y/N] ").strip().lower() != "y":
+                telemetry.finish("duplicate")
+                print("Cancelled.")
+                sys.exit(0)
 
     api_key = get_api_key()
-
-    # Optionally enrich genre_lineage with real TMDB similar-movies data
-    tmdb_context = ""
     tmdb_api_key = get_tmdb_api_key()
-    if tmdb_api_key:
-        movie_id = args.tmdb_id
-        if movie_id is None:
-            # Extract a rough title guess from the first line of the body for search
-            first_line = body.strip().split("\n")[0][:80]
-            print(f"\nSearching TMDB for: {first_line!r}...")
-            movie_id = search_tmdb(first_line, "", tmdb_api_key)
-        if movie_id:
-            print(f"  Fetching similar movies for TMDB ID {movie_id}...")
-            similar = fetch_similar_movies(movie_id, tmdb_api_key)
-            if similar:
-                tmdb_context = build_tmdb_context(similar)
-                print(f"  Found {len(similar)} similar films from TMDB.")
-            else:
-                print("  No similar movies found on TMDB.")
-        else:
-            print("  Could not find film on TMDB — proceeding without TMDB context.")
-    else:
-        print("\n(TMDB_API_KEY not set — genre_lineage will be generated from post text alone.)")
 
-    # Generate front matter via Claude
-    print("\nGenerating front matter via Claude API...")
-    try:
-        meta = generate_front_matter(body, api_key, tmdb_context=tmdb_context)
-    except (json.JSONDecodeError, anthropic.APIError) as e:
-        print(f"Error generating front matter: {e}")
-        sys.exit(1)
+    cached = load_cached_draft(body, args.tmdb_id, bool(tmdb_api_key))
+    telemetry.set(watch_cache_hit=bool(cached))
+    if cached:
+        print("\nUsing pre-warmed front matter from the watch cache.")
+        meta = cached["meta"]
+    else:
+        # Optionally enrich genre_lineage with real TMDB similar-movies data
+        tmdb_context = fetch_tmdb_context(body, args.tmdb_id, tmdb_api_key, telemetry=telemetry)
+
+        # Generate front matter via Claude
+        print("\nGenerating front matter via Claude API...")
+        try:
+            meta = generate_front_matter(body, api_key, tmdb_context=tmdb_context, telemetry=telemetry)
+        except (json.JSONDecodeError, anthropic.APIError) as e:
+            print(f"Error generating front matter: {e}")
+            sys.exit(1)
+        # Cache it too, so a watcher still debouncing this draft finds it warm
+        save_cached_draft(body, args.tmdb_id, bool(tmdb_api_key), tmdb_context, meta, source=args.body)
 
     today = date.today().isoformat()
     cover_name = cover_path.name
@@ -453,11 +831,16 @@ def main():
     print("=" * 60)
 
     # Interactive confirmation
+    confirm_started = time.monotonic()
+    edits = 0
     while True:
         choice = input("\n[C]onfirm, [E]dit fields, or [Q]uit? ").strip().lower()
         if choice == "c":
+            telemetry.record_stage("confirm", (time.monotonic() - confirm_started) * 1000)
+            telemetry.set(edits=edits)
             break
         elif choice == "e":
+            edits += 1
             new_title = input(f"  Title [{meta['title']}]: ").strip()
             if new_title:
                 meta["title"] = new_title
@@ -488,6 +871,9 @@ def main():
             print("\nUpdated front matter:")
             print(front_matter)
         elif choice == "q":
+            telemetry.record_stage("confirm", (time.monotonic() - confirm_started) * 1000, status="quit")
+            telemetry.set(edits=edits)
+            telemetry.finish("quit")
             print("Cancelled.")
             sys.exit(0)
 
@@ -504,11 +890,13 @@ def main():
     post_file.write_text(full_content, encoding="utf-8")
 
     # Copy images
-    shutil.copy2(cover_path, staging_dir / cover_name)
-    if article_cover_path:
-        shutil.copy2(article_cover_path, staging_dir / article_cover_name)
-    for p in secondary_paths:
-        shutil.copy2(p, staging_dir / p.name)
+    with telemetry.stage("image_copy"):
+        shutil.copy2(cover_path, staging_dir / cover_name)
+        if article_cover_path:
+            shutil.copy2(article_cover_path, staging_dir / article_cover_name)
+        for p in secondary_paths:
+            shutil.copy2(p, staging_dir / p.name)
+    telemetry.finish("created")
 
     print(f"\nPost created at: {staging_dir}/")
     print(f"  - {post_file}")
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+page_weight.py — Page-weight and request-count budget report for Reel Refractions
+==================================================================================
+
+Walks the built Hugo site and works out what each page costs a reader:
+transfer bytes by resource type, number of requests, render-blocking
+resources and the largest image. Results are compared against the committed
+per-template budgets in scripts/page_budgets.json, and the script exits
+non-zero if any page goes over.
+
+Budgets must come from a real build: create the file with --update-baseline
+after `hugo --gc --minify`. Until it exists the script only reports and
+says no budgets were checked; with --require-budgets (as `npm run
+page-weight` runs it) a missing or empty budget file is an error.
+
+Usage:
+    hugo --gc --minify
+    python scripts/page_weight.py [public_dir] [--budgets scripts/page_budgets.json]
+                                  [--require-budgets] [--json results.json] [--verbose]
+    python scripts/page_weight.py --update-baseline   # after an intentional change
+
+Requirements:
+    - Python standard library only
+
+What is counted per page (each URL once):
+    - the HTML document itself (inline scripts such as audio_narration.html
+      are part of its bytes)
+    - <link rel=stylesheet|preload|modulepreload|icon>, <script src>, <img>,
+      <source srcset>, <video>/<audio> posters and sources
+    - url() references inside same-site stylesheets — fonts from @font-face
+      are counted as an upper bound, since any review may use every weight
+    - runtime fetches that are not in the markup (the Fuse index.json on the
+      search page)
+
+For srcset, the candidate a browser would pick for --image-width device
+pixels is counted. Hotlinked resources (Letterboxd posters, analytics) are
+counted as requests with unknown bytes; same-site absolute URLs are resolved
+against baseURL from hugo.yaml.
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import urllib.parse
+from pathlib import Path
+
+from critical_css import classify_page, parse_html
+
+
+DEFAULT_BUDGETS = Path(__file__).parent / "page_budgets.json"
+DEFAULT_IMAGE_WIDTH = 1080
+DEFAULT_HEADROOM = 0.10
+
+METRICS = ("total_bytes", "requests", "render_blocking", "largest_image_bytes")
+
+_RESOURCE_TYPES = {
+    "css": "css",
+    "js": "js",
+    "mjs": "js",
+    "json": "json",
+    "woff2": "font",
+    "woff": "font",
+    "ttf": "font",
+    "otf": "font",
+    "jpg": "image",
+    "jpeg": "image",
+    "png": "image",
+    "gif": "image",
+    "webp": "image",
+    "avif": "image",
+    "svg": "image",
+    "ico": "image",
+    "mp3": "media",
+    "m4a": "media",
+    "mp4": "media",
+    "webm": "media",
+}
+
+# Resources requested by JavaScript rather than markup, per template type.
+_RUNTIME_FETCHES = {
+    "search": ["/index.json"],
+}
+
+_PRELOAD_AS_TYPES = {"style": "css", "script": "js", "font": "font", "image": "image", "fetch": "json"}
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_BASE_URL_RE = re.compile(r"""^baseURL:\s*["']?([^"'\s]+)""", re.MULTILINE)
+
+
+def read_base_url(site_root: Path) -> str:
+    """Return baseURL from hugo.yaml in site_root, or "" if it cannot be found."""
+    config = site_root / "hugo.yaml"
+    if not config.is_file():
+        return ""
+    match = _BASE_URL_RE.search(config.read_text(encoding="utf-8"))
+    return match.group(1) if match else ""
+
+
+def resource_type(url: str) -> str:
+    """Classify a URL by file extension into css/js/json/font/image/media/other."""
+    path = urllib.parse.urlparse(url).path
+    ext = path.rsplit(".", 1)[-1].lower() if "." in path.rsplit("/", 1)[-1] else ""
+    return _RESOURCE_TYPES.get(ext, "other")
+
+
+def parse_srcset(srcset: str) -> list[tuple[str, float, str]]:
+    """Parse a srcset attribute into [(url, value, unit)] where unit is "w" or "x"."""
+    candidates = []
+    for candidate in re.split(r",\s+", srcset.strip()):
+        fields = candidate.strip().split()
+        if not fields:
+            continue
+        url = fields[0].rstrip(",")
+        value, unit = 1.0, "x"
+        if len(fields) > 1 and fields[1][-1:] in ("w", "x"):
+            try:
+                value, unit = float(fields[1][:-1]), fields[1][-1]
+            except ValueError:
+                pass
+        candidates.append((url, value, unit))
+    return candidates
+
+
+def pick_srcset_candidate(srcset: str, image_width: int = DEFAULT_IMAGE_WIDTH) -> str | None:
+    """Return the srcset URL a browser would fetch at image_width device pixels.
+
+    Width descriptors: the smallest candidate at least image_width wide, or the
+    widest if none is. Density descriptors: the 1x candidate (or the lowest).
+    """
+    candidates = parse_srcset(srcset)
+    if not candidates:
+        return None
+    widths = sorted((c for c in candidates if c[2] == "w"), key=lambda c: c[1])
+    if widths:
+        return next((c[0] for c in widths if c[1] >= image_width), widths[-1][0])
+    return min(candidates, key=lambda c: abs(c[1] - 1))[0]
+
+
+def resolve_local(url: str, page_url: str, base_url: str) -> str | None:
+    """Return the site-relative path for url, or None if it is off-site.
+
+    page_url is the page's own site path (e.g. "/posts/film/").
+    """
+    if url.startswith("data:"):
+        return None
+    absolute = urllib.parse.urljoin(urllib.parse.urljoin(base_url or "/", page_url), url)
+    parsed = urllib.parse.urlparse(absolute)
+    base = urllib.parse.urlparse(base_url)
+    if parsed.scheme and parsed.netloc and parsed.netloc != base.netloc:
+        return None
+    return urllib.parse.unquote(parsed.path)
+
+
+def _inside(element: dict, tag: str) -> bool:
+    node = element["parent"]
+    while node is not None:
+        if node["tag"] == tag:
+            return True
+        node = node["parent"]
+    return False
+
+
+def is_render_blocking(element: dict) -> bool:
+    """Return True for stylesheets and synchronous head scripts that block first paint."""
+    attrs = element["attrs"]
+    if _inside(element, "noscript"):
+        return False
+    if element["tag"] == "link":
+        rels = attrs.get("rel", "").lower().split()
+        media = attrs.get("media", "all").strip().lower()
+        return "stylesheet" in rels and media not in ("print", "not all")
+    if element["tag"] == "script" and "src" in attrs:
+        if "async" in attrs or "defer" in attrs or attrs.get("type", "").lower() == "module":
+            return False
+        return _inside(element, "head")
+    return False
+
+
+def collect_resources(document: dict, image_width: int = DEFAULT_IMAGE_WIDTH) -> list[dict]:
+    """Return the sub-resources referenced by a parsed page's markup.
+
+    Each entry is {"url", "type", "render_blocking"}; URLs are not yet resolved.
+    """
+    resources = []
+
+    def add(url: str | None, kind: str | None = None, blocking: bool = False) -> None:
+        if url and not url.startswith(("data:", "#", "javascript:")):
+            resources.append({"url": url, "type": kind or resource_type(url), "render_blocking": blocking})
+
+    for element in document["elements"]:
+        tag = element["tag"]
+        attrs = element["attrs"]
+        if tag == "link":
+            rels = attrs.get("rel", "").lower().split()
+            if "stylesheet" in rels or "preload" in rels or "modulepreload" in rels or "icon" in rels:
+                kind = _PRELOAD_AS_TYPES.get(attrs.get("as", "")) if "preload" in rels else None
+                add(attrs.get("href"), kind, is_render_blocking(element))
+        elif tag == "script":
+            add(attrs.get("src"), "js", is_render_blocking(element))
+        elif tag in ("img", "source"):
+            srcset = attrs.get("srcset")
+            chosen = pick_srcset_candidate(srcset, image_width) if srcset else None
+            if _inside(element, "noscript"):
+                continue
+            add(chosen or attrs.get("src"), "image" if tag == "img" else None)
+        elif tag in ("video", "audio"):
+            add(attrs.get("poster"), "image")
+            add(attrs.get("src"), "media")
+    return resources
+
+
+def _css_references(css: str) -> list[str]:
+    return [m.group(2).strip() for m in _CSS_URL_RE.finditer(css)]
+
+
+def measure_page(
+    path: Path,
+    public_dir: Path,
+    base_url: str = "",
+    image_width: int = DEFAULT_IMAGE_WIDTH,
+) -> dict:
+    """Measure a single built page. Returns a result dict (see module docstring)."""
+    rel_path = path.relative_to(public_dir)
+    page_url = "/" + rel_path.as_posix()
+    html_bytes = path.stat().st_size
+    document = parse_html(path.read_text(encoding="utf-8"))
+    page_type = classify_page(rel_path, document)
+
+    resources = collect_resources(document, image_width)
+    resources += [{"url": u, "type": resource_type(u), "render_blocking": False}
+                  for u in _RUNTIME_FETCHES.get(page_type, [])]
+
+    seen = {}
+    queue = list(resources)
+    while queue:
+        resource = queue.pop(0)
+        local = resolve_local(resource["url"], page_url, base_url)
+        key = local if local is not None else resource["url"]
+        if key in seen:
+            seen[key]["render_blocking"] |= resource["render_blocking"]
+            continue
+        entry = {**resource, "url": key, "bytes": None, "external": local is None}
+        if local is not None:
+            file = public_dir / local.lstrip("/")
+            if file.is_dir():
+                file = file / "index.html"
+            if file.is_file():
+                entry["bytes"] = file.stat().st_size
+                if entry["type"] == "css":
+                    css = file.read_text(encoding="utf-8", errors="replace")
+                    queue.extend(
+                        {"url": urllib.parse.urljoin(key, ref), "type": resource_type(ref), "render_blocking": False}
+                        for ref in _css_references(css)
+                    )
+        seen[key] = entry
+
+    by_type = {"html": html_bytes}
+    for entry in seen.values():
+        by_type[entry["type"]] = by_type.get(entry["type"], 0) + (entry["bytes"] or 0)
+
+    images = [e for e in seen.values() if e["type"] == "image" and e["bytes"]]
+    largest = max(images, key=lambda e: e["bytes"], default=None)
+
+    return {
+        "page": page_url,
+        "page_type": page_type,
+        "total_bytes": sum(by_type.values()),
+        "bytes_by_type": dict(sorted(by_type.items())),
+        "requests": 1 + len(seen),
+        "external_requests": sum(1 for e in seen.values() if e["external"]),
+        "missing": sorted(e["url"] for e in seen.values() if not e["external"] and e["bytes"] is None),
+        "render_blocking": sorted(e["url"] for e in seen.values() if e["render_blocking"]),
+        "largest_image": largest["url"] if largest else None,
+        "largest_image_bytes": largest["bytes"] if largest else 0,
+    }
+
+
+def measure_site(public_dir: Path, base_url: str = "", image_width: int = DEFAULT_IMAGE_WIDTH) -> list[dict]:
+    """Measure every HTML page under public_dir, sorted by page URL."""
+    return [
+        measure_page(path, public_dir, base_url, image_width)
+        for path in sorted(public_dir.rglob("*.html"))
+    ]
+
+
+def _metric(result: dict, metric: str) -> int:
+    value = result[metric]
+    return len(value) if isinstance(value, list) else value
+
+
+def check_budgets(results: list[dict], budgets: dict) -> list[dict]:
+    """Return one entry per page metric that exceeds its page-type budget.
+
+    Page types missing from budgets are not checked.
+    """
+    regressions = []
+    for result in results:
+        budget = budgets.get("budgets", {}).get(result["page_type"])
+        if not budget:
+            continue
+        for metric in METRICS:
+            if metric not in budget:
+                continue
+            actual = _metric(result, metric)
+            if actual > budget[metric]:
+                regressions.append({
+                    "page": result["page"],
+                    "page_type": result["page_type"],
+                    "metric": metric,
+                    "actual": actual,
+                    "budget": budget[metric],
+                })
+    return regressions
+
+
+def build_baseline(results: list[dict], headroom: float = DEFAULT_HEADROOM) -> dict:
+    """Derive per-template budgets from measured results plus headroom.
+
+    Byte budgets get the headroom; counts (requests, render-blocking) do not,
+    since a single extra request is exactly what the budget should catch.
+    """
+    budgets = {}
+    for result in results:
+        current = budgets.setdefault(result["page_type"], {m: 0 for m in METRICS})
+        for metric in METRICS:
+            current[metric] = max(current[metric], _metric(result, metric))
+    for current in budgets.values():
+        for metric in ("total_bytes", "largest_image_bytes"):
+            current[metric] = int(math.ceil(current[metric] * (1 + headroom) / 1024) * 1024)
+    return {"headroom": headroom, "budgets": dict(sorted(budgets.items()))}
+
+
+def format_summary(results: list[dict], budgets: dict, verbose: bool = False) -> str:
+    """Format per-template maxima against budgets (and per-page rows if verbose)."""
+    header = f"{'Template':<10} {'Pages':>5} {'Max total':>12} {'Max reqs':>9} {'Blocking':>9} {'Largest img':>12}"
+    lines = [header, "-" * len(header)]
+    by_type = {}
+    for result in results:
+        by_type.setdefault(result["page_type"], []).append(result)
+    for page_type, rows in sorted(by_type.items()):
+        budget = budgets.get("budgets", {}).get(page_type, {})
+
+        def cell(metric: str, fmt) -> str:
+            value = max(_metric(r, metric) for r in rows)
+            limit = budget.get(metric)
+            return fmt(value) + ("" if limit is None else f"/{fmt(limit)}")
+
+        lines.append(
+            f"{page_type:<10} {len(rows):>5} {cell('total_bytes', _kb):>12} {cell('requests', str):>9} "
+            f"{cell('render_blocking', str):>9} {cell('largest_image_bytes', _kb):>12}"
+        )
+        if verbose:
+            for r in rows:
+                types = ", ".join(f"{k} {_kb(v)}" for k, v in r["bytes_by_type"].items())
+                lines.append(f"    {r['page']}: {_kb(r['total_bytes'])}, {r['requests']} requests ({types})")
+    return "\n".join(lines)
+
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:.0f}K"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report per-page weight and request counts for the built site and enforce budgets."
+    )
+    parser.add_argument("public_dir", nargs="?", default="public", help="Hugo output directory (default: public)")
+    parser.add_argument(
+        "--budgets",
+        default=str(DEFAULT_BUDGETS),
+        metavar="FILE",
+        help="Budget baseline JSON (default: scripts/page_budgets.json)",
+    )
+    parser.add_argument(
+        "--image-width",
+        type=int,
+        default=DEFAULT_IMAGE_WIDTH,
+        metavar="PX",
+        help=f"Device-pixel width used to pick srcset candidates (default: {DEFAULT_IMAGE_WIDTH})",
+    )
+    parser.add_argument(
+        "--require-budgets",
+        action="store_true",
+        help="Exit 1 if the budgets file is missing or empty instead of only reporting",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Write full per-page results as JSON to FILE")
+    parser.add_argument("--verbose", action="store_true", help="Also list every page with its byte breakdown")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Rewrite the budgets file from this build instead of checking against it",
+    )
+    parser.add_argument(
+        "--headroom",
+        type=float,
+        default=DEFAULT_HEADROOM,
+        help=f"Fractional byte headroom used by --update-baseline (default: {DEFAULT_HEADROOM})",
+    )
+    args = parser.parse_args()
+
+    public_dir = Path(args.public_dir)
+    if not public_dir.is_dir():
+        print(f"Error: Output directory not found: {public_dir}")
+        print("Run `hugo --gc --minify` first.")
+        sys.exit(1)
+
+    base_url = read_base_url(public_dir.resolve().parent)
+    results = measure_site(public_dir, base_url, args.image_width)
+    if not results:
+        print(f"Error: No HTML pages found in {public_dir}")
+        sys.exit(1)
+
+    budgets_path = Path(args.budgets)
+    if args.update_baseline:
+        baseline = build_baseline(results, args.headroom)
+        budgets_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(format_summary(results, baseline, args.verbose))
+        print(f"\nBaseline written to {budgets_path}")
+        return
+
+    budgets = {}
+    if budgets_path.is_file():
+        budgets = json.loads(budgets_path.read_text(encoding="utf-8"))
+    if not budgets.get("budgets"):
+        if args.require_budgets:
+            print(f"Error: No budgets in {budgets_path}")
+            print("Create them from a real build with --update-baseline and commit the file.")
+            sys.exit(1)
+        print(f"(No budgets in {budgets_path} — reporting only.")
+        print(" Create them from this build with --update-baseline.)")
+
+    print(format_summary(results, budgets, args.verbose))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+    missing = sorted({url for r in results for url in r["missing"]})
+    if missing:
+        print(f"\nReferenced but not in {public_dir} (counted as requests, 0 bytes):")
+        for url in missing:
+            print(f"  - {url}")
+
+    regressions = check_budgets(results, budgets)
+    if regressions:
+        print(f"\nBUDGET EXCEEDED on {len(regressions)} metric(s):")
+        for r in regressions:
+            print(f"  {r['page']} [{r['page_type']}] {r['metric']}: {r['actual']} > {r['budget']}")
+        sys.exit(1)
+    if not budgets.get("budgets"):
+        print("\nNo budgets checked.")
+        return
+    print("\nAll pages within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+telemetry.py — Per-run telemetry for the Reel Refractions content workflow
+==========================================================================
+
+new_post.py records one JSON line per run to .cache/telemetry.jsonl
+(gitignored): how long each stage took, what TMDB found, Claude token usage
+and estimated cost, and how the run ended. `new_post.py --stats` summarises
+the log.
+
+A record looks like:
+    {"timestamp": "2026-10-19T09:12:44+00:00", "mode": "interactive",
+     "outcome": "created", "total_ms": 48213.5,
+     "stages": {"docs_fetch": {"ms": 812.4, "status": "ok"},
+                "tmdb_search": {"ms": 301.2, "status": "not_found"}, ...},
+     "fields": {"body_chars": 5813, "prompt_chars": 9120, "film_resolution": "search", ...},
+     "usage": {"input_tokens": 2310, "output_tokens": 612,
+               "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0},
+     "model": "claude-sonnet-4-6", "cost_usd": 0.01611}
+
+Stage statuses are "ok", "error", or a stage-specific outcome such as
+"not_found" or "empty".
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+TELEMETRY_LOG = Path(".cache") / "telemetry.jsonl"
+
+# USD per million tokens. Update alongside CLAUDE_MODEL in new_post.py.
+MODEL_PRICING = {
+    "claude-sonnet-4-6": {
+        "input_tokens": 3.00,
+        "output_tokens": 15.00,
+        "cache_creation_input_tokens": 3.75,
+        "cache_read_input_tokens": 0.30,
+    },
+}
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def estimate_cost(model: str, usage: dict) -> float | None:
+    """Return the estimated USD cost of a call, or None for an unpriced model."""
+    prices = MODEL_PRICING.get(model)
+    if prices is None:
+        return None
+    return round(sum(usage.get(k, 0) * prices[k] for k in USAGE_FIELDS) / 1_000_000, 6)
+
+
+class RunTelemetry:
+    """Collect stage timings and usage for one run and append it to the log."""
+
+    def __init__(self, mode: str, log_path: Path = TELEMETRY_LOG):
+        self.log_path = log_path
+        self.started = time.monotonic()
+        self.record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "mode": mode,
+            "outcome": "error",
+            "total_ms": None,
+            "stages": {},
+            "fields": {},
+            "usage": {},
+            "model": None,
+            "cost_usd": None,
+        }
+        self._finished = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block. The yielded dict's "status" may be set by the caller.
+
+        An exception (including SystemExit) marks the stage "error" and propagates.
+        """
+        entry = {"ms": None, "status": "ok"}
+        self.record["stages"][name] = entry
+        started = time.monotonic()
+        try:
+            yield entry
+        except BaseException:
+            entry["status"] = "error"
+            raise
+        finally:
+            entry["ms"] = round((time.monotonic() - started) * 1000, 1)
+
+    def record_stage(self, name: str, ms: float, status: str = "ok") -> None:
+        """Record a stage timed by the caller (e.g. one that ends in several places)."""
+        self.record["stages"][name] = {"ms": round(ms, 1), "status": status}
+
+    def set(self, **fields) -> None:
+        """Record arbitrary run fields (counts, flags, which path was taken)."""
+        self.record["fields"].update(fields)
+
+    def set_usage(self, model: str, usage) -> None:
+        """Record token usage from an Anthropic ``message.usage`` object (or dict)."""
+        values = {}
+        for key in USAGE_FIELDS:
+            value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+            values[key] = value if isinstance(value, int) else 0
+        self.record["model"] = model
+        self.record["usage"] = values
+        self.record["cost_usd"] = estimate_cost(model, values)
+
+    def finish(self, outcome: str | None = None) -> None:
+        """Append the record to the log once. Later calls are ignored."""
+        if self._finished:
+            return
+        self._finished = True
+        if outcome:
+            self.record["outcome"] = outcome
+        self.record["total_ms"] = round((time.monotonic() - self.started) * 1000, 1)
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.log_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(self.record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"(Could not write telemetry to {self.log_path}: {e})")
+
+
+def stage(telemetry: RunTelemetry | None, name: str):
+    """Return telemetry.stage(name), or a no-op context when telemetry is None."""
+    return telemetry.stage(name) if telemetry is not None else nullcontext({})
+
+
+def load_runs(log_path: Path = TELEMETRY_LOG, since_days: float | None = None) -> list[dict]:
+    """Return logged runs (oldest first), optionally only the last since_days days."""
+    if not log_path.is_file():
+        return []
+    cutoff = datetime.now(timezone.utc) - timedelta(days=since_days) if since_days else None
+    runs = []
+    for line in log_path.read_text(encoding="utf-8").splitlines():
+        try:
+            run = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if cutoff is not None:
+            try:
+                if datetime.fromisoformat(run["timestamp"]) < cutoff:
+                    continue
+            except (KeyError, ValueError):
+                continue
+        runs.append(run)
+    return runs
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of values (pct in 0–100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarise_runs(runs: list[dict]) -> dict:
+    """Aggregate runs into outcome counts, stage timing percentiles, token totals and failure rates."""
+    outcomes = {}
+    stage_ms = {}
+    stage_status = {}
+    usage_totals = dict.fromkeys(USAGE_FIELDS, 0)
+    cost = 0.0
+    claude_calls = 0
+    for run in runs:
+        outcomes[run.get("outcome", "unknown")] = outcomes.get(run.get("outcome", "unknown"), 0) + 1
+        for name, entry in run.get("stages", {}).items():
+            if entry.get("ms") is not None:
+                stage_ms.setdefault(name, []).append(entry["ms"])
+            statuses = stage_status.setdefault(name, {})
+            statuses[entry.get("status", "ok")] = statuses.get(entry.get("status", "ok"), 0) + 1
+        if run.get("usage"):
+            claude_calls += 1
+            for key in USAGE_FIELDS:
+                usage_totals[key] += run["usage"].get(key, 0)
+            cost += run.get("cost_usd") or 0.0
+
+    stages = {
+        name: {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "p95": percentile(values, 95),
+            "max": max(values),
+        }
+        for name, values in stage_ms.items()
+    }
+    failure_rates = {
+        name: round(1 - statuses.get("ok", 0) / sum(statuses.values()), 4)
+        for name, statuses in stage_status.items()
+    }
+    return {
+        "runs": len(runs),
+        "outcomes": outcomes,
+        "stages": stages,
+        "stage_statuses": stage_status,
+        "failure_rates": failure_rates,
+        "claude_calls": claude_calls,
+        "usage": usage_totals,
+        "cost_usd": round(cost, 4),
+    }
+
+
+def format_stats(summary: dict) -> str:
+    """Format a summarise_runs() result for the terminal."""
+    if not summary["runs"]:
+        return "No runs recorded yet."
+    lines = [
+        f"Runs: {summary['runs']}  ("
+        + ", ".join(f"{k} {v}" for k, v in sorted(summary["outcomes"].items())) + ")",
+        "",
+        f"{'Stage':<14} {'n':>4} {'p50':>9} {'p90':>9} {'p95':>9} {'max':>9}  not ok",
+    ]
+    for name, s in summary["stages"].items():
+        statuses = summary["stage_statuses"][name]
+        not_ok = ", ".join(f"{k} {v}" for k, v in sorted(statuses.items()) if k != "ok")
+        lines.append(
+            f"{name:<14} {s['count']:>4} {_seconds(s['p50']):>9} {_seconds(s['p90']):>9} "
+            f"{_seconds(s['p95']):>9} {_seconds(s['max']):>9}  "
+            f"{summary['failure_rates'][name]:.0%}" + (f" ({not_ok})" if not_ok else "")
+        )
+    calls = summary["claude_calls"]
+    usage = summary["usage"]
+    lines.append("")
+    if calls:
+        lines.append(
+            f"Claude calls: {calls}  input {usage['input_tokens']:,} (avg {usage['input_tokens'] // calls:,})  "
+            f"output {usage['output_tokens']:,} (avg {usage['output_tokens'] // calls:,})"
+        )
+        lines.append(
+            f"Prompt cache: write {usage['cache_creation_input_tokens']:,}  read {usage['cache_read_input_tokens']:,}"
+        )
+        lines.append(f"Estimated cost: ${summary['cost_usd']:.4f} (avg ${summary['cost_usd'] / calls:.4f} per call)")
+    else:
+        lines.append("Claude calls: 0")
+    return "\n".join(lines)
+
+
+def _seconds(ms: float) -> str:
+    return f"{ms / 1000:.2f}s"
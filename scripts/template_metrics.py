@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+template_metrics.py — Hugo template-metrics profiling with history for Reel Refractions
+=======================================================================================
+
+Runs `hugo --templateMetrics --templateMetricsHints`, parses the metrics table
+into structured records, appends the run to a local history file and prints
+the slowest templates plus the biggest regressions against the previous run.
+
+Usage:
+    python scripts/template_metrics.py [--top N] [--history FILE] [-- extra hugo args]
+    python scripts/template_metrics.py --from-file captured_output.txt
+
+Requirements:
+    - Hugo on PATH (not needed with --from-file)
+    - Python standard library only
+
+Each history line is one JSON run record:
+    {"timestamp": ..., "hugo_args": [...], "wall_seconds": ..., "records": [
+        {"template": "partials/recent_watches.html", "count": 1,
+         "cumulative_ms": ..., "average_ms": ..., "maximum_ms": ...,
+         "cache_potential": 0, "percent_cached": 0, "cached_count": 0}, ...]}
+
+The history lives in .cache/ at the project root, which is gitignored.
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_HISTORY = PROJECT_ROOT / ".cache" / "template_metrics.jsonl"
+DEFAULT_TOP = 10
+# Ignore regressions smaller than this — run-to-run noise on a laptop.
+DEFAULT_MIN_DELTA_MS = 5.0
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(h|ms|m|s|µs|μs|us|ns)")
+_DURATION_RE = re.compile(r"^(?:\d+(?:\.\d+)?(?:h|ms|m|s|µs|μs|us|ns))+$")
+_DURATION_MS = {
+    "h": 3_600_000.0,
+    "m": 60_000.0,
+    "s": 1000.0,
+    "ms": 1.0,
+    "µs": 0.001,
+    "μs": 0.001,
+    "us": 0.001,
+    "ns": 0.000001,
+}
+
+
+def parse_duration(text: str) -> float:
+    """Convert a Go duration string ("1.5s", "94.2ms", "1m2s", "800ns") to milliseconds."""
+    text = text.strip()
+    if text == "0":
+        return 0.0
+    if not _DURATION_RE.match(text):
+        raise ValueError(f"Not a Go duration: {text!r}")
+    return sum(float(value) * _DURATION_MS[unit] for value, unit in _DURATION_PART_RE.findall(text))
+
+
+def parse_metrics(output: str) -> list[dict]:
+    """Parse Hugo's template metrics table into records, slowest first.
+
+    Handles both the plain table (cumulative, average, maximum, count,
+    template) and the --templateMetricsHints table, which adds cache
+    potential, percent cached and cached count. Lines that are not table
+    rows (build summary, warnings) are ignored.
+    """
+    records = []
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) < 5:
+            continue
+        try:
+            durations = [parse_duration(f) for f in fields[:3]]
+        except ValueError:
+            continue
+        numbers = fields[3:-1]
+        if not all(n.isdigit() for n in numbers):
+            continue
+        record = {
+            "template": fields[-1],
+            "count": 0,
+            "cumulative_ms": round(durations[0], 6),
+            "average_ms": round(durations[1], 6),
+            "maximum_ms": round(durations[2], 6),
+        }
+        if len(numbers) == 4:
+            record["cache_potential"] = int(numbers[0])
+            record["percent_cached"] = int(numbers[1])
+            record["cached_count"] = int(numbers[2])
+            record["count"] = int(numbers[3])
+        elif len(numbers) == 1:
+            record["count"] = int(numbers[0])
+        else:
+            continue
+        records.append(record)
+    records.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return records
+
+
+def load_history(path: Path) -> list[dict]:
+    """Return all run records from the history file (oldest first)."""
+    if not path.is_file():
+        return []
+    runs = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line:
+            try:
+                runs.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return runs
+
+
+def append_history(path: Path, run: dict) -> None:
+    """Append one run record to the history file, creating it if needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+
+def compare_runs(previous: list[dict], current: list[dict], min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> list[dict]:
+    """Return templates whose cumulative time grew by more than min_delta_ms.
+
+    Sorted by absolute increase, largest first. Templates that are new in the
+    current run are included with a previous time of 0.
+    """
+    before = {r["template"]: r for r in previous}
+    regressions = []
+    for record in current:
+        old = before.get(record["template"])
+        old_ms = old["cumulative_ms"] if old else 0.0
+        delta = record["cumulative_ms"] - old_ms
+        if delta <= min_delta_ms:
+            continue
+        regressions.append({
+            "template": record["template"],
+            "previous_ms": old_ms,
+            "current_ms": record["cumulative_ms"],
+            "delta_ms": round(delta, 6),
+            "percent": round(100 * delta / old_ms, 1) if old_ms else None,
+            "previous_count": old["count"] if old else 0,
+            "count": record["count"],
+        })
+    regressions.sort(key=lambda r: r["delta_ms"], reverse=True)
+    return regressions
+
+
+def run_hugo(hugo: str, hugo_args: list[str]) -> tuple[str, float]:
+    """Run Hugo with template metrics enabled. Returns (stdout, wall seconds)."""
+    if shutil.which(hugo) is None:
+        print(f"Error: '{hugo}' not found on PATH.")
+        print("Install Hugo or pass --from-file with captured output.")
+        sys.exit(1)
+    cmd = [hugo, "--templateMetrics", "--templateMetricsHints", *hugo_args]
+    started = time.monotonic()
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    elapsed = time.monotonic() - started
+    if proc.returncode != 0:
+        print(proc.stdout)
+        print(proc.stderr, file=sys.stderr)
+        print(f"Error: hugo exited with status {proc.returncode}")
+        sys.exit(proc.returncode)
+    return proc.stdout, elapsed
+
+
+def _ms(value: float) -> str:
+    return f"{value / 1000:.2f}s" if value >= 1000 else f"{value:.1f}ms"
+
+
+def format_top(records: list[dict], top: int) -> str:
+    """Format the slowest templates by cumulative time as a table."""
+    header = f"{'Cumulative':>11} {'Average':>9} {'Maximum':>9} {'Count':>6} {'Cache':>6}  Template"
+    lines = [header, "-" * (len(header) + 20)]
+    for r in records[:top]:
+        lines.append(
+            f"{_ms(r['cumulative_ms']):>11} {_ms(r['average_ms']):>9} {_ms(r['maximum_ms']):>9} "
+            f"{r['count']:>6} {r.get('cache_potential', '-'):>6}  {r['template']}"
+        )
+    return "\n".join(lines)
+
+
+def format_regressions(regressions: list[dict], top: int) -> str:
+    """Format regressions versus the previous run."""
+    lines = []
+    for r in regressions[:top]:
+        pct = "new" if r["percent"] is None else f"+{r['percent']}%"
+        counts = "" if r["count"] == r["previous_count"] else f" (calls {r['previous_count']} → {r['count']})"
+        lines.append(
+            f"  +{_ms(r['delta_ms']):>9}  {_ms(r['previous_ms']):>9} → {_ms(r['current_ms']):<9} {pct:>7}  "
+            f"{r['template']}{counts}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Profile Hugo templates and track regressions across builds.",
+        epilog="Arguments after -- are passed to hugo unchanged.",
+    )
+    parser.add_argument("--hugo", default="hugo", help="Hugo executable (default: hugo)")
+    parser.add_argument(
+        "--history",
+        default=str(DEFAULT_HISTORY),
+        metavar="FILE",
+        help="JSONL history file (default: .cache/template_metrics.jsonl)",
+    )
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Rows to show (default: {DEFAULT_TOP})")
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=DEFAULT_MIN_DELTA_MS,
+        metavar="MS",
+        help=f"Smallest cumulative increase reported as a regression (default: {DEFAULT_MIN_DELTA_MS}ms)",
+    )
+    parser.add_argument("--from-file", metavar="FILE", help="Parse captured hugo output instead of running hugo")
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    parser.add_argument("hugo_args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    hugo_args = args.hugo_args[1:] if args.hugo_args[:1] == ["--"] else args.hugo_args
+
+    if args.from_file:
+        source = Path(args.from_file)
+        if not source.is_file():
+            print(f"Error: Captured output not found: {source}")
+            sys.exit(1)
+        output, wall_seconds = source.read_text(encoding="utf-8"), None
+    else:
+        print(f"Running hugo --templateMetrics --templateMetricsHints {' '.join(hugo_args)}".rstrip() + "...")
+        output, wall_seconds = run_hugo(args.hugo, hugo_args)
+
+    records = parse_metrics(output)
+    if not records:
+        print("Error: No template metrics found in Hugo output.")
+        sys.exit(1)
+
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    run = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "hugo_args": hugo_args,
+        "wall_seconds": round(wall_seconds, 3) if wall_seconds is not None else None,
+        "records": records,
+    }
+
+    # No summed total: a template's cumulative time includes the partials it
+    # calls, so adding rows up double-counts nested templates.
+    print(f"\n{len(records)} templates"
+          + (f", {wall_seconds:.2f}s wall" if wall_seconds is not None else ""))
+    print("\nSLOWEST TEMPLATES (cumulative)")
+    print(format_top(records, args.top))
+
+    if history:
+        previous = history[-1]
+        regressions = compare_runs(previous["records"], records, args.min_delta)
+        print(f"\nREGRESSIONS vs run at {previous['timestamp']}")
+        print(format_regressions(regressions, args.top) if regressions else "  None.")
+    else:
+        print("\n(No previous run in history — nothing to compare against.)")
+
+    if not args.no_save:
+        append_history(history_path, run)
+        print(f"\nRun appended to {history_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Tests for archive_data.py.
+
+Covers the publish filter, each aggregate and the incremental hash
+manifest, using a small synthetic content/posts tree.
+"""
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from archive_data import (
+    build_archive,
+    collect_records,
+    post_record,
+    read_front_matter,
+    stale_files,
+    write_archive,
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _write_post(posts: Path, bundle: str, front_matter: str) -> Path:
+    path = posts / bundle / "index.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\n{front_matter.strip()}\n---\n\nBody.\n", encoding="utf-8")
+    return path
+
+
+def _record(bundle: str, **fields) -> dict:
+    front_matter = {"title": bundle, "date": "2025-10-05T19:00:00Z", **fields}
+    return post_record(bundle, front_matter)
+
+
+def test_read_front_matter_parses_lists():
+    fm = read_front_matter('---\ntitle: "X"\ntags:\n  - "Sci-Fi"\n  - "Zoë Kravitz"\n---\nBody')
+    assert post_record("x", fm)["tags"] == ["Sci-Fi", "Zoë Kravitz"]
+    assert read_front_matter("No front matter") == {}
+
+
+def test_drafts_future_and_expired_posts_are_excluded():
+    records = [
+        _record("live"),
+        _record("draft", draft=True),
+        _record("future", date="2026-06-01T00:00:00Z"),
+        _record("expired", expiryDate="2025-12-01T00:00:00Z"),
+    ]
+    years = build_archive(records, NOW)["years"]
+    assert years["post_count"] == 1
+    assert years["years"][0]["months"][0]["posts"][0]["page"] == "/posts/live"
+
+
+def test_years_grouped_newest_first():
+    records = [
+        _record("a", date="2024-03-02T10:00:00Z"),
+        _record("b", date="2025-10-05T10:00:00Z"),
+        _record("c", date="2025-10-13T10:00:00Z"),
+        _record("d", date="2025-11-09T10:00:00Z"),
+    ]
+    years = build_archive(records, NOW)["years"]["years"]
+    assert [y["year"] for y in years] == ["2025", "2024"]
+    assert years[0]["count"] == 3
+    assert [m["month"] for m in years[0]["months"]] == ["November", "October"]
+    assert [p["page"] for p in years[0]["months"][1]["posts"]] == ["/posts/c", "/posts/b"]
+
+
+def test_recent_posts_by_date_regardless_of_weight():
+    records = [_record(f"p{day}", date=f"2025-10-{day:02d}T10:00:00Z") for day in range(1, 8)]
+    records.append(_record("pinned", date="2024-01-01T10:00:00Z", weight=1))
+    years = build_archive(records, NOW)["years"]
+    assert years["years"][1]["months"][0]["posts"][0]["page"] == "/posts/pinned"
+    assert [p["page"] for p in years["recent"]] == ["/posts/p7", "/posts/p6", "/posts/p5", "/posts/p4", "/posts/p3"]
+    assert years["recent"][0] == {"page": "/posts/p7", "title": "p7", "date": "2025-10-07"}
+
+
+def test_terms_merge_case_variants_and_sort_alphabetically():
+    records = [
+        _record("a", tags=["Sci-Fi", "Action"], categories=["New Releases"]),
+        _record("b", tags=["sci-fi"], categories=["Revisits"]),
+    ]
+    terms = build_archive(records, NOW)["terms"]
+    assert terms["tags"] == [{"name": "Action", "count": 1}, {"name": "Sci-Fi", "count": 2}]
+    assert [c["name"] for c in terms["categories"]] == ["New Releases", "Revisits"]
+
+
+def test_top_tags_follow_hugo_by_count_order():
+    records = [_record(f"p{i}", tags=["Drama"] + (["Heist"] if i < 2 else []) + [f"T{i:02d}"]) for i in range(14)]
+    top = build_archive(records, NOW)["terms"]["top_tags"]
+    assert len(top) == 12
+    assert [t["name"] for t in top[:4]] == ["Drama", "Heist", "T00", "T01"]
+
+
+def test_lineage_maps_lowercased_titles_to_reviews():
+    records = [_record("tron", title="Tron: Ares (2025)"), _record("dredd", title=" Dredd (2012)")]
+    lineage = build_archive(records, NOW)["lineage"]
+    assert lineage == {"reviewed": {"dredd (2012)": "/posts/dredd", "tron: ares (2025)": "/posts/tron"}}
+
+
+def test_collect_records_reparses_only_changed_bundles(tmp_path: Path):
+    posts, manifest = tmp_path / "posts", tmp_path / "manifest.json"
+    _write_post(posts, "a", 'title: "A"\ndate: 2025-10-05')
+    _write_post(posts, "b", 'title: "B"\ndate: 2025-10-06')
+
+    records, parsed = collect_records(posts, manifest)
+    assert parsed == 2
+    assert collect_records(posts, manifest)[1] == 0
+
+    _write_post(posts, "b", 'title: "B, revised"\ndate: 2025-10-06')
+    (posts / "a" / "index.md").unlink()
+    records, parsed = collect_records(posts, manifest)
+    assert parsed == 1
+    assert [r["title"] for r in records] == ["B, revised"]
+    assert list(json.loads(manifest.read_text(encoding="utf-8"))["posts"]) == ["b"]
+
+
+def test_collect_records_can_skip_the_manifest(tmp_path: Path):
+    """--check must write nothing, the manifest included."""
+    posts, manifest = tmp_path / "posts", tmp_path / "manifest.json"
+    _write_post(posts, "a", 'title: "A"\ndate: 2025-10-05')
+    records, parsed = collect_records(posts, manifest, save_manifest=False)
+    assert parsed == 1 and records[0]["title"] == "A"
+    assert not manifest.exists()
+
+
+def test_write_archive_skips_unchanged_files(tmp_path: Path):
+    archive = build_archive([_record("a", tags=["X"])], NOW)
+    data = tmp_path / "data"
+    assert len(write_archive(archive, data)) == 3
+    assert write_archive(archive, data) == []
+    assert stale_files(archive, data) == []
+
+    newer = build_archive([_record("a", tags=["X"]), _record("b")], NOW)
+    assert {p.name for p in stale_files(newer, data)} == {"years.json", "lineage.json"}
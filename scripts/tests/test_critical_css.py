@@ -0,0 +1,248 @@
+"""Tests for critical_css.py.
+
+Covers CSS parsing/serialisation, the minimal HTML tree builder, selector
+matching, page classification and an end-to-end run over a tiny public/ tree.
+"""
+from pathlib import Path
+
+from critical_css import (
+    PROCESSED_MARKER,
+    classify_page,
+    collect_js_classes,
+    filter_rules,
+    find_stylesheet_link,
+    is_safelisted,
+    match_page,
+    parse_css,
+    parse_html,
+    parse_selector,
+    process_site,
+    selector_matches,
+    serialize_css,
+    split_selector_list,
+)
+
+CSS = """
+/* fonts */
+@font-face { font-family: 'X'; src: url('/x.woff2'); }
+:root { --bg: #000; }
+body { color: red; }
+.post-card, .vault-entry { margin: 0; }
+.post-card:hover .post-card-cover img { transform: scale(1.02); }
+.audio-player { display: flex; }
+@media (max-width: 768px) {
+  .post-card { padding: 0; }
+  .recent-watches { display: none; }
+}
+"""
+
+
+def _page(body: str, body_class: str = "") -> str:
+    return (
+        "<!doctype html><html lang=en><head>"
+        "<link rel=stylesheet href=/css/custom.min.abc.css integrity=sha256-x crossorigin=anonymous>"
+        f"</head><body class=\"{body_class}\" id=top>{body}</body></html>"
+    )
+
+
+def _first(document: dict, tag: str) -> dict:
+    return next(e for e in document["elements"] if e["tag"] == tag)
+
+
+# ---------------------------------------------------------------------------
+# CSS parsing
+# ---------------------------------------------------------------------------
+
+
+def test_parse_css_drops_comments_and_keeps_structure():
+    rules = parse_css(CSS)
+    types = [r["type"] for r in rules]
+    assert types == ["at", "rule", "rule", "rule", "rule", "rule", "group"]
+    assert rules[3]["selectors"] == [".post-card", ".vault-entry"]
+    assert rules[-1]["prelude"] == "@media (max-width: 768px)"
+    assert len(rules[-1]["rules"]) == 2
+
+
+def test_split_selector_list_ignores_commas_in_parentheses():
+    assert split_selector_list("a:is(.x, .y),  b\n c") == ["a:is(.x, .y)", "b c"]
+
+
+def test_serialize_round_trip_is_stable():
+    once = serialize_css(parse_css(CSS))
+    assert serialize_css(parse_css(once)) == once
+
+
+def test_filter_rules_drops_empty_groups_and_unmatched_selectors():
+    rules = parse_css(CSS)
+    out = serialize_css(filter_rules(rules, {"body", ".vault-entry"}, keep_at=False))
+    assert "@media" not in out
+    assert ".vault-entry{margin: 0;}" in out
+    assert ".post-card" not in out
+    assert out.startswith("@font-face")
+
+
+# ---------------------------------------------------------------------------
+# HTML tree and selector matching
+# ---------------------------------------------------------------------------
+
+
+def test_parse_html_handles_omitted_end_tags():
+    document = parse_html("<ul><li><a>1</a><li><a>2</a></ul><p>x<div>y</div>")
+    lis = [e for e in document["elements"] if e["tag"] == "li"]
+    assert [li["parent"]["tag"] for li in lis] == ["ul", "ul"]
+    assert _first(document, "div")["parent"]["tag"] == "#document"
+
+
+def test_svg_children_do_not_advance_fold_index():
+    document = parse_html("<svg><rect/><rect/><rect/></svg><p>after</p>")
+    assert _first(document, "p")["index"] == 1
+
+
+def test_descendant_and_child_combinators():
+    document = parse_html('<div class="post-card"><span><img class="x"></span></div>')
+    img = _first(document, "img")
+    assert selector_matches(img, parse_selector(".post-card img"))
+    assert not selector_matches(img, parse_selector(".post-card > img"))
+    assert selector_matches(img, parse_selector("span > img.x"))
+
+
+def test_sibling_combinators_and_attributes():
+    document = parse_html('<h2></h2><p></p><input type="email">')
+    element = _first(document, "input")
+    assert selector_matches(element, parse_selector('p + input[type="email"]'))
+    assert selector_matches(element, parse_selector("h2 ~ input[type^=em]"))
+    assert not selector_matches(element, parse_selector("h2 + input"))
+
+
+def test_pseudo_classes_are_ignored_for_matching():
+    document = parse_html('<button class="hamburger"><span class="hamburger-line"></span></button>')
+    span = _first(document, "span")
+    assert selector_matches(span, parse_selector(".hamburger-line:nth-child(1)"))
+    assert selector_matches(span, parse_selector(".hamburger:hover .hamburger-line::after"))
+
+
+def test_match_page_splits_critical_from_below_fold():
+    rules = parse_css(CSS)
+    filler = "<p></p>" * 20
+    document = parse_html(_page(f'<div class="post-card"></div>{filler}<div class="audio-player"></div>'))
+    matched, critical = match_page(rules, document, fold=10, layout_depth=0)
+    assert {".post-card", ".audio-player", "body"} <= matched
+    assert ".recent-watches" not in matched
+    assert ".post-card" in critical
+    assert ".audio-player" not in critical
+
+
+def test_safelisted_selectors_always_match():
+    rules = parse_css("#searchResults li { color: red; }")
+    matched, critical = match_page(rules, parse_html(_page("")))
+    assert matched == {"#searchResults li"}
+    assert critical == set()
+
+
+def test_js_classes_are_safelisted_on_whole_class_names_only():
+    safe = frozenset({"dark", "list"})
+    assert is_safelisted("body.dark .post-card", (), safe)
+    assert is_safelisted(".list", (), safe)
+    assert not is_safelisted(".dark-mode", (), safe)
+    assert not is_safelisted(".list-item, .listing", (), safe)
+    # Hand-written safelist entries still match as substrings
+    assert is_safelisted(".copy-code-button", (".copy-code",), safe)
+
+
+# ---------------------------------------------------------------------------
+# Site processing
+# ---------------------------------------------------------------------------
+
+
+def test_classify_page():
+    assert classify_page(Path("index.html"), parse_html(_page(""))) == "home"
+    assert classify_page(Path("page/2/index.html"), parse_html(_page(""))) == "home"
+    assert classify_page(Path("vault/index.html"), parse_html(_page('<div class="vault-page"></div>'))) == "vault"
+    assert classify_page(Path("search/index.html"), parse_html(_page('<div id="searchbox"></div>'))) == "search"
+    assert classify_page(Path("tags/index.html"), parse_html(_page("", "list"))) == "list"
+    assert classify_page(Path("posts/x/index.html"), parse_html(_page(""))) == "single"
+
+
+def test_find_stylesheet_link_returns_tag_and_href():
+    link = find_stylesheet_link(_page(""))
+    assert link is not None
+    assert link[1] == "/css/custom.min.abc.css"
+    assert link[0].startswith("<link rel=stylesheet")
+
+
+def test_process_site_rewrites_pages_and_writes_deferred_css(tmp_path: Path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "custom.min.abc.css").write_text(CSS, encoding="utf-8")
+    (tmp_path / "index.html").write_text(_page('<div class="post-card"></div>', "list"), encoding="utf-8")
+    post = tmp_path / "posts" / "film"
+    post.mkdir(parents=True)
+    (post / "index.html").write_text(_page('<div class="audio-player"></div>'), encoding="utf-8")
+
+    report = process_site(tmp_path)
+
+    assert set(report) == {"home", "single"}
+    single = report["single"]
+    assert single["removed_bytes"] > 0
+    deferred = (tmp_path / single["deferred_stylesheet"].lstrip("/")).read_text(encoding="utf-8")
+    assert ".audio-player" in deferred
+    assert ".recent-watches" not in deferred
+    html = (post / "index.html").read_text(encoding="utf-8")
+    assert f"<style {PROCESSED_MARKER}>" in html
+    assert "custom.min.abc.css" not in html
+    assert single["deferred_stylesheet"] in html
+
+
+def test_process_site_dry_run_leaves_files_untouched(tmp_path: Path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "custom.min.abc.css").write_text(CSS, encoding="utf-8")
+    original = _page('<div class="post-card"></div>', "list")
+    (tmp_path / "index.html").write_text(original, encoding="utf-8")
+
+    report = process_site(tmp_path, dry_run=True)
+
+    assert report["home"]["pages"] == 1
+    assert (tmp_path / "index.html").read_text(encoding="utf-8") == original
+    assert sorted(p.name for p in (tmp_path / "css").iterdir()) == ["custom.min.abc.css"]
+
+
+def test_process_site_second_run_leaves_pages_alone(tmp_path: Path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "custom.min.abc.css").write_text(CSS, encoding="utf-8")
+    (tmp_path / "index.html").write_text(_page('<div class="post-card"></div>', "list"), encoding="utf-8")
+
+    process_site(tmp_path)
+    once = (tmp_path / "index.html").read_text(encoding="utf-8")
+    css_files = sorted(p.name for p in (tmp_path / "css").iterdir())
+
+    assert process_site(tmp_path) == {}
+    assert (tmp_path / "index.html").read_text(encoding="utf-8") == once
+    assert once.count("<noscript>") == 1
+    assert sorted(p.name for p in (tmp_path / "css").iterdir()) == css_files
+
+
+def test_collect_js_classes():
+    js = """
+    el.classList.add('copy-code', "is-open");
+    el.classList.contains("highlight");
+    menu.className = "menu open";
+    out += `<li class="post-entry"><header class="entry-header ${extra}">`;
+    """
+    assert collect_js_classes([js]) == {"copy-code", "is-open", "menu", "open", "post-entry", "entry-header"}
+
+
+def test_process_site_keeps_classes_added_by_site_js(tmp_path: Path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "custom.min.abc.css").write_text(
+        CSS + ".search-hit { color: blue; } .search-hit-meta { color: green; }", encoding="utf-8"
+    )
+    (tmp_path / "js").mkdir()
+    (tmp_path / "js" / "search.js").write_text('r += `<li class="search-hit">`;', encoding="utf-8")
+    post = tmp_path / "posts" / "film"
+    post.mkdir(parents=True)
+    (post / "index.html").write_text(_page("<div></div>"), encoding="utf-8")
+
+    report = process_site(tmp_path)
+
+    deferred = (tmp_path / report["single"]["deferred_stylesheet"].lstrip("/")).read_text(encoding="utf-8")
+    assert ".search-hit" in deferred
+    assert ".search-hit-meta" not in deferred
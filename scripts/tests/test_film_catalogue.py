@@ -0,0 +1,142 @@
+"""Tests for film_catalogue.py.
+
+Builds a small catalogue from a synthetic TMDB daily export in tmp_path and
+covers lookup ranking, title candidate extraction and body resolution.
+"""
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from film_catalogue import (
+    build_catalogue,
+    extract_title_candidates,
+    lookup_title,
+    open_catalogue,
+    resolve_body,
+    resolve_film,
+)
+
+EXPORT_ROWS = [
+    {"adult": False, "id": 533533, "original_title": "TRON: Ares", "popularity": 310.5, "video": False},
+    {"adult": False, "id": 20526, "original_title": "TRON: Legacy", "popularity": 45.2, "video": False},
+    {"adult": False, "id": 97, "original_title": "Tron", "popularity": 30.1, "video": False},
+    {"adult": False, "id": 1242898, "original_title": "Predator: Badlands", "popularity": 420.0, "video": False},
+    {"adult": False, "id": 766507, "original_title": "Prey", "popularity": 60.0, "video": False},
+    {"adult": False, "id": 5001, "original_title": "Prey", "popularity": 1.2, "video": False, "release_date": "2007-01-01"},
+    {"adult": False, "id": 949, "original_title": "Heat", "popularity": 50.0, "video": False, "release_date": "1995-12-15"},
+    {"adult": False, "id": 7001, "original_title": "Heat", "popularity": 3.0, "video": False, "release_date": "1986-03-14"},
+    {"adult": False, "id": 8001, "original_title": "Parasite", "popularity": 2.0, "video": False},
+    {"adult": False, "id": 496243, "original_title": "기생충", "popularity": 80.0, "video": False},
+    {"adult": False, "id": 11906, "original_title": "Suspiria", "popularity": 20.0, "video": False},
+    {"adult": False, "id": 361292, "original_title": "Suspiria", "popularity": 40.0, "video": False},
+    {"adult": False, "id": 9999, "original_title": "Tron Making Of", "popularity": 900.0, "video": True},
+    {"adult": True, "id": 9998, "original_title": "Tron Adult", "popularity": 900.0, "video": False},
+]
+
+
+@pytest.fixture
+def catalogue(tmp_path: Path):
+    export = tmp_path / "movie_ids_10_19_2026.json.gz"
+    with gzip.open(export, "wt", encoding="utf-8") as f:
+        for row in EXPORT_ROWS:
+            f.write(json.dumps(row) + "\n")
+        f.write("not json\n")
+    db_path = tmp_path / "catalogue.db"
+    assert build_catalogue(export, db_path) == 12
+    conn = open_catalogue(db_path)
+    yield conn
+    conn.close()
+
+
+def test_build_skips_video_and_adult_rows(catalogue):
+    ids = {row[0] for row in catalogue.execute("SELECT id FROM films")}
+    assert 9999 not in ids
+    assert 9998 not in ids
+
+
+def test_lookup_exact_title_ignores_case_and_punctuation(catalogue):
+    assert lookup_title(catalogue, "Tron Ares")[0]["id"] == 533533
+
+
+def test_lookup_fuzzy_falls_back_to_any_word(catalogue):
+    matches = lookup_title(catalogue, "Predator Badland")
+    assert matches[0]["id"] == 1242898
+    assert matches[0]["similarity"] > 0.9
+
+
+def test_lookup_prefers_popular_film_among_equal_titles(catalogue):
+    assert lookup_title(catalogue, "Prey")[0]["id"] == 766507
+
+
+def test_lookup_year_hint_beats_popularity(catalogue):
+    assert lookup_title(catalogue, "Heat", 1986)[0]["id"] == 7001
+    assert lookup_title(catalogue, "Heat", 1995)[0]["id"] == 949
+
+
+def test_extract_candidates_folds_short_mentions_into_full_title():
+    body = (
+        "Before seeing *Tron: Ares*, I tried to rewatch *Tron: Legacy*.\n\n"
+        "Where *Ares* shines is the score. *Tron: Ares* is a treat."
+    )
+    candidates = extract_title_candidates(body)
+    assert candidates[0]["title"] == "Tron: Ares"
+    assert candidates[0]["mentions"] == 3
+    assert "Ares" not in [c["title"] for c in candidates]
+
+
+def test_extract_candidates_picks_up_years_and_skips_sentences():
+    body = (
+        "I loved it.\n\nAdd to that *Prey* (2022), a surprise hit. "
+        "*I'm rolling my eyes at you, Mission: Impossible – Dead Reckoning Part One* aside, "
+        "it rivals Heat (1995)."
+    )
+    titles = {c["title"]: c["year"] for c in extract_title_candidates(body)}
+    assert titles["Prey"] == 2022
+    assert titles["Heat"] == 1995
+    assert not any(t.startswith("I'm") for t in titles)
+
+
+def test_extract_candidates_breaks_ties_on_recurring_words():
+    body = (
+        "Add to that *Prey*, a surprise hit. So when I heard about *Predator: Badlands* I was in.\n\n"
+        "This Predator is a runt. The badlands look grey. *Prey* did it better. "
+        "*Predator: Badlands* never commits. The Predator dialogue is odd."
+    )
+    assert extract_title_candidates(body)[0]["title"] == "Predator: Badlands"
+
+
+def test_resolve_body_returns_reviewed_film(catalogue):
+    body = "Before seeing *Tron: Ares*, I rewatched *Tron: Legacy*.\n\n*Ares* is a visual treat."
+    match = resolve_body(catalogue, body)
+    assert match["id"] == 533533
+    assert match["candidate"] == "Tron: Ares"
+    assert match["confident"] is True
+
+
+def test_resolve_body_year_the_catalogue_cannot_confirm_is_not_confident(catalogue):
+    """The export has no years, so "Parasite (2019)" must not trust an unrelated "Parasite" row."""
+    match = resolve_body(catalogue, "*Parasite* (2019) is a masterpiece. *Parasite* lingers.")
+    assert match["id"] == 8001
+    assert match["confident"] is False
+    assert (match["candidate"], match["candidate_year"]) == ("Parasite", 2019)
+
+
+def test_resolve_body_shared_title_is_not_confident(catalogue):
+    """Several rows titled "Suspiria" and no year in the catalogue to tell them apart."""
+    assert resolve_body(catalogue, "*Suspiria* is a nightmare. *Suspiria* again.")["confident"] is False
+
+
+def test_resolve_body_year_singles_out_shared_title(catalogue):
+    match = resolve_body(catalogue, "*Heat* (1986) is not the Mann film. *Heat* again.")
+    assert match["id"] == 7001
+    assert match["confident"] is True
+
+
+def test_resolve_body_without_confident_match_returns_none(catalogue):
+    assert resolve_body(catalogue, "Just some thoughts.\n\n*Completely Unknown Picture* was fine.") is None
+
+
+def test_resolve_film_without_catalogue_returns_none(tmp_path: Path):
+    assert resolve_film("*Tron: Ares*", tmp_path / "missing.db") is None
@@ -0,0 +1,174 @@
+"""Tests for near_duplicates.py.
+
+Covers shingling, MinHash estimates, the incremental signature index and
+draft matching against a small synthetic archive.
+"""
+import os
+import random
+import threading
+from pathlib import Path
+
+import pytest
+
+import near_duplicates
+from near_duplicates import (
+    check_draft,
+    estimate_containment,
+    estimate_jaccard,
+    find_near_duplicates,
+    load_index,
+    minhash,
+    shingle_hashes,
+    split_post,
+    update_index,
+)
+
+_VOCAB = (
+    "film camera light story actor score frame scene cut night city rain voice silence memory "
+    "villain hero chase color shadow dream machine ocean desert road house mirror stage crowd"
+).split()
+
+
+def _prose(seed: int, words: int = 400) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_VOCAB) for _ in range(words))
+
+
+def _write_post(posts: Path, name: str, title: str, body: str) -> Path:
+    path = posts / name / "index.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f'---\ntitle: "{title}"\ndraft: false\n---\n\n{body}\n', encoding="utf-8")
+    return path
+
+
+def test_split_post_returns_title_and_body():
+    title, body = split_post('---\ntitle: "Tron: Ares"\ntags: []\n---\n\nThe grid returns.\n')
+    assert title == "Tron: Ares"
+    assert body.strip() == "The grid returns."
+
+
+def test_shingles_ignore_case_punctuation_and_shortcodes():
+    a = shingle_hashes("The Grid, returns!  Again.")
+    b = shingle_hashes('the grid returns again\n\n{{< figure src="still.jpg" alt="x" >}}')
+    assert a == b
+    assert shingle_hashes("") == set()
+    assert len(shingle_hashes("Two words")) == 1
+
+
+def test_identical_text_has_identical_signature():
+    text = _prose(1)
+    assert estimate_jaccard(minhash(shingle_hashes(text)), minhash(shingle_hashes(text))) == 1.0
+
+
+def test_jaccard_estimate_tracks_true_overlap():
+    a, b = shingle_hashes(_prose(1)), shingle_hashes(_prose(1)[:1200] + " " + _prose(2)[:1200])
+    true = len(a & b) / len(a | b)
+    assert abs(estimate_jaccard(minhash(a), minhash(b)) - true) < 0.15
+
+
+def test_containment_estimate():
+    # Draft of 200 shingles that contains all 100 of the post's: J = 0.5
+    assert estimate_containment(0.5, 200, 100) == 1.0
+    assert estimate_containment(0.0, 200, 100) == 0.0
+    assert estimate_containment(0.5, 200, 0) == 0.0
+
+
+def test_update_index_is_incremental(tmp_path: Path):
+    posts, index_path = tmp_path / "posts", tmp_path / "index.json"
+    first = _write_post(posts, "2025-01-01-first", "First", _prose(1))
+    _write_post(posts, "2025-02-01-second", "Second", _prose(2))
+
+    index, resigned = update_index(posts, index_path)
+    assert resigned == 2
+    assert set(load_index(index_path)["posts"]) == {"2025-01-01-first", "2025-02-01-second"}
+
+    assert update_index(posts, index_path)[1] == 0
+
+    # Touching without changing the text does not re-sign the post
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+    assert update_index(posts, index_path)[1] == 0
+
+    _write_post(posts, "2025-02-01-second", "Second", _prose(3))
+    (posts / "2025-01-01-first" / "index.md").unlink()
+    index, resigned = update_index(posts, index_path)
+    assert resigned == 1
+    assert set(index["posts"]) == {"2025-02-01-second"}
+
+
+def test_load_index_discards_incompatible_version(tmp_path: Path):
+    index_path = tmp_path / "index.json"
+    index_path.write_text('{"version": 0, "posts": {"x": {}}}', encoding="utf-8")
+    assert load_index(index_path)["posts"] == {}
+
+
+def test_light_rewrite_is_flagged(tmp_path: Path):
+    posts = tmp_path / "posts"
+    original = _prose(1)
+    _write_post(posts, "2025-01-01-original", "Original", original)
+    _write_post(posts, "2025-02-01-other", "Other", _prose(2))
+
+    words = original.split()
+    for i in range(0, len(words), 25):
+        words[i] = "different"
+    matches = check_draft(" ".join(words), posts, tmp_path / "index.json")
+    assert [m["post"] for m in matches] == ["2025-01-01-original"]
+    assert matches[0]["title"] == "Original"
+
+
+def test_extended_draft_is_flagged_by_containment(tmp_path: Path):
+    """A revisit that keeps the old review and doubles it still matches."""
+    posts, index_path = tmp_path / "posts", tmp_path / "index.json"
+    _write_post(posts, "2025-01-01-original", "Original", _prose(1))
+    index, _ = update_index(posts, index_path)
+
+    matches = find_near_duplicates(_prose(1) + " " + _prose(7, 600), index)
+    assert len(matches) == 1
+    assert matches[0]["similarity"] < 0.5
+    assert matches[0]["containment"] >= 0.5
+
+
+def test_unrelated_draft_is_not_flagged(tmp_path: Path):
+    posts = tmp_path / "posts"
+    _write_post(posts, "2025-01-01-original", "Original", _prose(1))
+    assert check_draft(_prose(9), posts, tmp_path / "index.json") == []
+
+
+def test_check_draft_without_archive_returns_nothing(tmp_path: Path):
+    assert check_draft("Anything.", tmp_path / "missing", tmp_path / "index.json") == []
+
+
+def test_concurrent_index_updates_do_not_collide(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Watch mode checks drafts from several threads; every writer must succeed.
+
+    A barrier holds both writers until each has written its temp file, so a
+    shared temp name would make the second replace fail every time.
+    """
+    posts = tmp_path / "posts"
+    _write_post(posts, "2025-01-01-post", "Post", _prose(1))
+    index_path = tmp_path / "index.json"
+    barrier = threading.Barrier(2, timeout=5)
+    real_replace = os.replace
+
+    def replace(src, dst):
+        barrier.wait()
+        real_replace(src, dst)
+
+    monkeypatch.setattr(near_duplicates.os, "replace", replace)
+    errors = []
+
+    def check():
+        try:
+            update_index(posts, index_path)
+        except Exception as e:  # noqa: BLE001 — collected for the assertion
+            errors.append(e)
+
+    threads = [threading.Thread(target=check) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert list(load_index(index_path)["posts"]) == ["2025-01-01-post"]
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
@@ -1,16 +1,28 @@
 """Tests for pure functions in new_post.py.
 
-Covers format_front_matter, format_body, and extract_doc_id.
+Covers format_front_matter, format_body, extract_doc_id, and the watch-mode
+draft cache and watcher.
 External dependencies (anthropic, Google APIs) are stubbed in conftest.py.
 """
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
 import pytest
 import yaml
 
+import new_post
 from new_post import (
     _REVIEW_TYPE_TO_CATEGORY,
+    DraftWatcher,
+    draft_cache_key,
     extract_doc_id,
+    fetch_tmdb_context,
     format_body,
     format_front_matter,
+    load_cached_draft,
+    prewarm_draft,
+    save_cached_draft,
 )
 
 TODAY = "2026-02-26"
@@ -285,3 +297,189 @@ def test_extract_doc_id_invalid_url_raises_system_exit():
     with pytest.raises(SystemExit) as exc_info:
         extract_doc_id("https://docs.google.com/document/not-a-valid-path")
     assert exc_info.value.code == 1
+
+
+# ---------------------------------------------------------------------------
+# Watch mode — draft cache, pre-warm and watcher
+# ---------------------------------------------------------------------------
+
+
+def test_draft_cache_key_ignores_surrounding_whitespace_only():
+    """Trailing newlines from an editor must not miss the cache; real edits must."""
+    assert draft_cache_key("Body.\n", None, True) == draft_cache_key("Body.", None, True)
+    assert draft_cache_key("Body.", None, True) != draft_cache_key("Body!", None, True)
+    assert draft_cache_key("Body.", None, True) != draft_cache_key("Body.", 533533, True)
+    assert draft_cache_key("Body.", None, True) != draft_cache_key("Body.", None, False)
+
+
+def test_draft_cache_round_trip(tmp_path: Path):
+    """A saved entry is returned for the same text and missed for different text."""
+    meta = _base_meta()
+    save_cached_draft("Body.", None, False, "", meta, cache_dir=tmp_path)
+    assert load_cached_draft("Body.", None, False, cache_dir=tmp_path)["meta"] == meta
+    assert load_cached_draft("Other.", None, False, cache_dir=tmp_path) is None
+
+
+def test_fetch_tmdb_context_without_key_returns_empty():
+    """With no TMDB key, no lookup is attempted and the context is empty."""
+    assert fetch_tmdb_context("Body.", None, None) == ""
+
+
+def test_prewarm_draft_caches_generated_meta(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """A successful pre-warm writes the generated meta to the cache exactly once."""
+    calls = []
+    monkeypatch.setattr(new_post, "generate_front_matter", lambda body, key, tmdb_context="", telemetry=None: calls.append(body) or _base_meta())
+    draft = tmp_path / "draft.txt"
+    draft.write_text("A new review.", encoding="utf-8")
+    cache = tmp_path / "cache"
+
+    assert prewarm_draft(draft, "sk-test", None, cache_dir=cache) is True
+    assert prewarm_draft(draft, "sk-test", None, cache_dir=cache) is False
+    assert len(calls) == 1
+    assert load_cached_draft("A new review.", None, False, cache_dir=cache)["meta"]["slug"] == "test-film-2024"
+
+
+def test_prewarm_draft_discards_result_when_cancelled(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """If the draft changes while Claude is running, nothing is cached."""
+    cancel = threading.Event()
+
+    def generate(body, key, tmdb_context="", telemetry=None):
+        cancel.set()
+        return _base_meta()
+
+    monkeypatch.setattr(new_post, "generate_front_matter", generate)
+    draft = tmp_path / "draft.txt"
+    draft.write_text("A new review.", encoding="utf-8")
+    cache = tmp_path / "cache"
+
+    assert prewarm_draft(draft, "sk-test", None, cancel, cache_dir=cache) is False
+    assert load_cached_draft("A new review.", None, False, cache_dir=cache) is None
+
+
+def test_prewarm_draft_skips_near_duplicate_of_existing_post(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """A draft that repeats an archived post is not sent to Claude."""
+    monkeypatch.setattr(new_post, "check_draft", lambda body, index_path: [{"post": "2025-01-01-old", "title": "Old"}])
+    monkeypatch.setattr(new_post, "generate_front_matter", lambda *a, **k: pytest.fail("Claude called for a duplicate"))
+    draft = tmp_path / "draft.txt"
+    draft.write_text("A new review.", encoding="utf-8")
+
+    assert prewarm_draft(draft, "sk-test", None, cache_dir=tmp_path / "cache") is False
+
+
+def test_report_prewarm_failure_prints_unexpected_exceptions(capsys: pytest.CaptureFixture):
+    """An exception escaping a background pre-warm is reported, not lost with the future."""
+    failed = Future()
+    failed.set_exception(PermissionError("draft locked"))
+    ok = Future()
+    ok.set_result(True)
+
+    new_post._report_prewarm_failure("draft.txt", failed)
+    new_post._report_prewarm_failure("other.txt", ok)
+
+    out = capsys.readouterr().out
+    assert "draft.txt: pre-warm failed: PermissionError: draft locked" in out
+    assert "other.txt" not in out
+
+
+def test_draft_watcher_debounces_changes(tmp_path: Path):
+    """A draft is ready only after it has been quiet for the debounce interval."""
+    watcher = DraftWatcher(tmp_path, debounce=2.0)
+    draft = tmp_path / "draft.txt"
+    draft.write_text("v1", encoding="utf-8")
+    (tmp_path / "notes.pdf").write_text("ignored", encoding="utf-8")
+
+    assert watcher.poll(0.0) == ([draft], [])
+    assert watcher.poll(1.0) == ([], [])
+    draft.write_text("v2 longer", encoding="utf-8")
+    assert watcher.poll(1.5) == ([draft], [])
+    assert watcher.poll(3.0) == ([], [])
+    assert watcher.poll(3.5) == ([], [draft])
+    assert watcher.poll(10.0) == ([], [])
+
+
+def test_draft_watcher_ignores_resave_with_same_text(tmp_path: Path):
+    """Touching a draft without changing its text does not count as a change."""
+    watcher = DraftWatcher(tmp_path, debounce=0.0)
+    draft = tmp_path / "draft.md"
+    draft.write_text("same", encoding="utf-8")
+    assert watcher.poll(0.0) == ([draft], [draft])
+    draft.write_text("same", encoding="utf-8")
+    assert watcher.poll(1.0) == ([], [])
+
+
+def test_draft_watcher_leaves_existing_drafts_alone_until_edited(tmp_path: Path):
+    """Drafts present at startup (often long published) are not pre-warmed unless edited."""
+    old = tmp_path / "published-long-ago.txt"
+    old.write_text("old review", encoding="utf-8")
+    watcher = DraftWatcher(tmp_path, debounce=0.0)
+
+    assert watcher.poll(0.0) == ([], [])
+    new = tmp_path / "new.txt"
+    new.write_text("new review", encoding="utf-8")
+    assert watcher.poll(1.0) == ([new], [new])
+    old.write_text("old review, revised", encoding="utf-8")
+    assert watcher.poll(2.0) == ([old], [old])
+
+
+def test_interactive_miss_warms_cache_for_watcher(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """A draft generated interactively is not generated again by a still-debouncing watcher."""
+    monkeypatch.chdir(tmp_path)
+    body = tmp_path / "draft.txt"
+    body.write_text("A new review.", encoding="utf-8")
+    cover = tmp_path / "cover.jpg"
+    cover.write_bytes(b"jpg")
+    calls = []
+    monkeypatch.setattr(new_post, "generate_front_matter", lambda body, key, tmdb_context="", telemetry=None: calls.append(body) or _base_meta())
+    monkeypatch.setattr(new_post, "get_api_key", lambda: "sk-test")
+    monkeypatch.setattr(new_post, "get_tmdb_api_key", lambda: None)
+    monkeypatch.setattr(new_post.atexit, "register", lambda func: None)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "c")
+    monkeypatch.setattr("sys.argv", ["new_post.py", str(body), str(cover)])
+
+    new_post.main()
+    assert prewarm_draft(body, "sk-test", None) is False
+    assert len(calls) == 1
+
+
+def test_fetch_tmdb_context_prefers_local_catalogue(monkeypatch: pytest.MonkeyPatch):
+    """A local catalogue match skips TMDB search and goes straight to similar movies."""
+    monkeypatch.setattr(new_post, "resolve_film", lambda body: {"id": 533533, "title": "TRON: Ares", "year": None, "confident": True})
+    monkeypatch.setattr(new_post, "search_tmdb", lambda *a: pytest.fail("search_tmdb should not be called"))
+    monkeypatch.setattr(new_post, "fetch_similar_movies", lambda movie_id, key: [{"title": "Heat", "year": "1995"}])
+    assert "Heat (1995)" in fetch_tmdb_context("*Tron: Ares* review.", None, "tmdb-key")
+
+
+def test_fetch_tmdb_context_search_fallback_uses_title_candidate(monkeypatch: pytest.MonkeyPatch):
+    """Without a local match, TMDB search is sent the likeliest title, not the first line."""
+    queries = []
+    monkeypatch.setattr(new_post, "resolve_film", lambda body: None)
+    monkeypatch.setattr(new_post, "search_tmdb", lambda title, year, key: queries.append((title, year)))
+    body = "Fucked life and fucked choices.\n\nAfter *Caught Stealing* (2025) I needed a drink."
+    assert fetch_tmdb_context(body, None, "tmdb-key") == ""
+    assert queries == [("Caught Stealing", "2025")]
+
+
+def test_fetch_tmdb_context_ambiguous_catalogue_match_searches_tmdb(monkeypatch: pytest.MonkeyPatch):
+    """A catalogue match it cannot confirm is not used; TMDB is searched with its title and year."""
+    queries = []
+    monkeypatch.setattr(new_post, "resolve_film", lambda body: {
+        "id": 1, "title": "Parasite", "year": None,
+        "candidate": "Parasite", "candidate_year": 2019, "confident": False,
+    })
+    monkeypatch.setattr(new_post, "search_tmdb", lambda title, year, key: queries.append((title, year)))
+    assert fetch_tmdb_context("*Parasite* (2019) review.", None, "tmdb-key") == ""
+    assert queries == [("Parasite", "2019")]
+
+
+def test_fetch_tmdb_context_records_stages_in_telemetry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """TMDB stages and their outcomes are recorded when telemetry is passed."""
+    monkeypatch.setattr(new_post, "resolve_film", lambda body: None)
+    monkeypatch.setattr(new_post, "search_tmdb", lambda title, year, key: 42)
+    monkeypatch.setattr(new_post, "fetch_similar_movies", lambda movie_id, key: [])
+    telemetry = new_post.RunTelemetry("interactive", log_path=tmp_path / "t.jsonl")
+    fetch_tmdb_context("*Tron: Ares* review.", None, "tmdb-key", telemetry=telemetry)
+    stages = telemetry.record["stages"]
+    assert stages["catalogue"]["status"] == "not_found"
+    assert stages["tmdb_search"]["status"] == "ok"
+    assert stages["tmdb_similar"]["status"] == "empty"
+    assert telemetry.record["fields"] == {"film_resolution": "search", "tmdb_found": True, "similar_count": 0}
@@ -0,0 +1,186 @@
+"""Tests for page_weight.py.
+
+Covers srcset selection, URL resolution, render-blocking detection, per-page
+measurement over a tiny public/ tree, the budget comparison and how the
+CLI handles a missing budget file.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+import page_weight
+from critical_css import parse_html
+from page_weight import (
+    build_baseline,
+    check_budgets,
+    collect_resources,
+    is_render_blocking,
+    measure_page,
+    pick_srcset_candidate,
+    resolve_local,
+    resource_type,
+)
+
+BASE_URL = "https://reel-refractions.com/"
+
+
+def _write(path: Path, content: str | bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content, encoding="utf-8")
+
+
+def _site(tmp_path: Path) -> Path:
+    """Build a one-post public/ tree and return the post's index.html."""
+    _write(tmp_path / "css" / "custom.css", "@font-face{src:url(/fonts/a.woff2)}body{color:red}")
+    _write(tmp_path / "fonts" / "a.woff2", b"f" * 300)
+    _write(tmp_path / "fonts" / "b.woff2", b"f" * 200)
+    _write(tmp_path / "posts" / "film" / "cover_360.webp", b"i" * 100)
+    _write(tmp_path / "posts" / "film" / "cover_1080.webp", b"i" * 900)
+    page = tmp_path / "posts" / "film" / "index.html"
+    _write(page, (
+        "<html><head>"
+        "<link rel=stylesheet href=/css/custom.css>"
+        "<link rel=preload href=/fonts/b.woff2 as=font crossorigin>"
+        "<script defer src=/_vercel/insights/script.js></script>"
+        "</head><body>"
+        f"<img srcset='{BASE_URL}posts/film/cover_360.webp 360w, cover_1080.webp 1080w' src=cover_360.webp>"
+        "<img src=https://a.ltrbxd.com/poster.jpg>"
+        "<script>var inline = 1;</script>"
+        "</body></html>"
+    ))
+    return page
+
+
+def test_resource_type_by_extension():
+    assert resource_type("/fonts/x.woff2?v=1") == "font"
+    assert resource_type("https://a.ltrbxd.com/p.JPG") == "image"
+    assert resource_type("/index.json") == "json"
+    assert resource_type("/posts/") == "other"
+
+
+def test_pick_srcset_candidate_width_descriptors():
+    srcset = "a.webp 360w, b.webp 720w, c.webp 1080w"
+    assert pick_srcset_candidate(srcset, 700) == "b.webp"
+    assert pick_srcset_candidate(srcset, 2000) == "c.webp"
+
+
+def test_pick_srcset_candidate_density_descriptors():
+    assert pick_srcset_candidate("a.png 2x, b.png 1x") == "b.png"
+
+
+def test_resolve_local():
+    assert resolve_local("cover.webp", "/posts/film/index.html", BASE_URL) == "/posts/film/cover.webp"
+    assert resolve_local(BASE_URL + "css/x.css", "/index.html", BASE_URL) == "/css/x.css"
+    assert resolve_local("https://a.ltrbxd.com/p.jpg", "/index.html", BASE_URL) is None
+
+
+def test_render_blocking_rules():
+    document = parse_html(
+        "<html><head><link rel=stylesheet href=a.css><link rel=stylesheet href=p.css media=print>"
+        "<script src=s.js></script><script defer src=d.js></script>"
+        "<noscript><link rel=stylesheet href=n.css></noscript></head>"
+        "<body><script src=b.js></script></body></html>"
+    )
+    blocking = [
+        e["attrs"].get("href") or e["attrs"].get("src")
+        for e in document["elements"]
+        if e["tag"] in ("link", "script") and is_render_blocking(e)
+    ]
+    assert blocking == ["a.css", "s.js"]
+
+
+def test_collect_resources_skips_data_uris():
+    document = parse_html("<img src='data:image/png;base64,AAA'><img src=x.png>")
+    assert [r["url"] for r in collect_resources(document)] == ["x.png"]
+
+
+def test_measure_page(tmp_path: Path):
+    page = _site(tmp_path)
+    result = measure_page(page, tmp_path, BASE_URL)
+
+    assert result["page_type"] == "single"
+    assert result["bytes_by_type"]["font"] == 500
+    assert result["bytes_by_type"]["image"] == 900
+    assert result["largest_image"] == "/posts/film/cover_1080.webp"
+    assert result["render_blocking"] == ["/css/custom.css"]
+    # html + css + 2 fonts + analytics + cover + hotlinked poster
+    assert result["requests"] == 7
+    assert result["external_requests"] == 1
+    assert result["missing"] == ["/_vercel/insights/script.js"]
+
+
+def test_search_page_counts_fuse_index(tmp_path: Path):
+    _write(tmp_path / "index.json", "[" + "1," * 50 + "1]")
+    page = tmp_path / "search" / "index.html"
+    _write(page, "<html><body class=list><div id=searchbox></div></body></html>")
+    result = measure_page(page, tmp_path, BASE_URL)
+    assert result["page_type"] == "search"
+    assert result["bytes_by_type"]["json"] == 103
+
+
+def test_check_budgets_flags_only_exceeded_metrics():
+    results = [
+        {"page": "/a/", "page_type": "single", "total_bytes": 2000, "requests": 5,
+         "render_blocking": ["/x.css", "/y.css"], "largest_image_bytes": 10},
+        {"page": "/b/", "page_type": "unbudgeted", "total_bytes": 10**9, "requests": 999,
+         "render_blocking": [], "largest_image_bytes": 0},
+    ]
+    budgets = {"budgets": {"single": {"total_bytes": 1000, "requests": 5, "render_blocking": 1}}}
+    regressions = check_budgets(results, budgets)
+    assert [(r["page"], r["metric"]) for r in regressions] == [("/a/", "total_bytes"), ("/a/", "render_blocking")]
+
+
+def test_build_baseline_adds_headroom_to_bytes_only():
+    results = [
+        {"page_type": "home", "total_bytes": 10_000, "requests": 12,
+         "render_blocking": ["/a.css"], "largest_image_bytes": 2048},
+        {"page_type": "home", "total_bytes": 9_000, "requests": 14,
+         "render_blocking": [], "largest_image_bytes": 0},
+    ]
+    baseline = build_baseline(results, headroom=0.1)
+    home = baseline["budgets"]["home"]
+    assert home["requests"] == 14
+    assert home["render_blocking"] == 1
+    assert home["total_bytes"] == 11264
+    assert home["largest_image_bytes"] == 3072
+
+
+def _run_main(monkeypatch: pytest.MonkeyPatch, *args: str) -> int:
+    monkeypatch.setattr("sys.argv", ["page_weight.py", *args])
+    try:
+        page_weight.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def test_missing_budgets_are_reported_not_passed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys):
+    public = tmp_path / "public"
+    _site(public)
+    budgets = tmp_path / "budgets.json"
+
+    assert _run_main(monkeypatch, str(public), "--budgets", str(budgets)) == 0
+    out = capsys.readouterr().out
+    assert "No budgets checked." in out
+    assert "within budget" not in out
+
+    assert _run_main(monkeypatch, str(public), "--budgets", str(budgets), "--require-budgets") == 1
+    assert "Error: No budgets in" in capsys.readouterr().out
+
+
+def test_budgets_from_baseline_are_enforced(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys):
+    public = tmp_path / "public"
+    page = _site(public)
+    budgets = tmp_path / "budgets.json"
+
+    assert _run_main(monkeypatch, str(public), "--budgets", str(budgets), "--update-baseline") == 0
+    assert _run_main(monkeypatch, str(public), "--budgets", str(budgets), "--require-budgets") == 0
+    assert "All pages within budget." in capsys.readouterr().out
+
+    page.write_text(page.read_text(encoding="utf-8") + "<!--" + "x" * 50_000 + "-->", encoding="utf-8")
+    assert _run_main(monkeypatch, str(public), "--budgets", str(budgets), "--require-budgets") == 1
+    assert "BUDGET EXCEEDED" in capsys.readouterr().out
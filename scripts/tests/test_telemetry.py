@@ -0,0 +1,123 @@
+"""Tests for telemetry.py.
+
+Covers stage timing, usage/cost capture, the JSONL log and the --stats summary.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from telemetry import (
+    RunTelemetry,
+    estimate_cost,
+    format_stats,
+    load_runs,
+    percentile,
+    stage,
+    summarise_runs,
+)
+
+
+def _run(outcome: str = "created", search_status: str = "ok", claude_ms: float = 1000.0,
+         input_tokens: int = 2000, timestamp: str | None = None) -> dict:
+    return {
+        "timestamp": timestamp or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": "interactive",
+        "outcome": outcome,
+        "stages": {
+            "tmdb_search": {"ms": 200.0, "status": search_status},
+            "claude": {"ms": claude_ms, "status": "ok"},
+        },
+        "usage": {"input_tokens": input_tokens, "output_tokens": 500,
+                  "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0},
+        "cost_usd": estimate_cost("claude-sonnet-4-6", {"input_tokens": input_tokens, "output_tokens": 500}),
+    }
+
+
+def test_stage_records_duration_and_caller_status(tmp_path: Path):
+    telemetry = RunTelemetry("interactive", log_path=tmp_path / "t.jsonl")
+    with telemetry.stage("tmdb_search") as st:
+        st["status"] = "not_found"
+    entry = telemetry.record["stages"]["tmdb_search"]
+    assert entry["status"] == "not_found"
+    assert entry["ms"] >= 0
+
+
+def test_stage_marks_error_and_reraises(tmp_path: Path):
+    telemetry = RunTelemetry("interactive", log_path=tmp_path / "t.jsonl")
+    with pytest.raises(SystemExit):
+        with telemetry.stage("docs_fetch"):
+            raise SystemExit(1)
+    assert telemetry.record["stages"]["docs_fetch"]["status"] == "error"
+
+
+def test_module_stage_helper_is_noop_without_telemetry():
+    with stage(None, "claude") as st:
+        st["status"] = "ok"
+
+
+def test_set_usage_reads_message_usage_and_prices_it(tmp_path: Path):
+    telemetry = RunTelemetry("interactive", log_path=tmp_path / "t.jsonl")
+    usage = SimpleNamespace(input_tokens=1_000_000, output_tokens=100_000,
+                            cache_creation_input_tokens=None, cache_read_input_tokens=0)
+    telemetry.set_usage("claude-sonnet-4-6", usage)
+    assert telemetry.record["usage"]["cache_creation_input_tokens"] == 0
+    assert telemetry.record["cost_usd"] == pytest.approx(4.5)
+
+
+def test_estimate_cost_unknown_model_is_none():
+    assert estimate_cost("some-other-model", {"input_tokens": 10}) is None
+
+
+def test_finish_appends_one_line_once(tmp_path: Path):
+    log = tmp_path / "nested" / "t.jsonl"
+    telemetry = RunTelemetry("interactive", log_path=log)
+    telemetry.set(body_chars=42)
+    telemetry.finish("quit")
+    telemetry.finish("created")
+    lines = log.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["outcome"] == "quit"
+    assert record["fields"]["body_chars"] == 42
+
+
+def test_load_runs_filters_by_age_and_skips_bad_lines(tmp_path: Path):
+    log = tmp_path / "t.jsonl"
+    old = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat(timespec="seconds")
+    log.write_text("\n".join([json.dumps(_run(timestamp=old)), "garbage", json.dumps(_run())]) + "\n",
+                   encoding="utf-8")
+    assert len(load_runs(log)) == 2
+    assert len(load_runs(log, since_days=7)) == 1
+
+
+def test_percentile_interpolates():
+    assert percentile([1, 2, 3, 4], 50) == pytest.approx(2.5)
+    assert percentile([5], 95) == 5
+    assert percentile([], 50) == 0.0
+
+
+def test_summarise_runs_totals_and_failure_rates():
+    runs = [
+        _run(search_status="ok", claude_ms=1000.0),
+        _run(search_status="not_found", claude_ms=3000.0),
+        _run(outcome="quit", search_status="not_found", claude_ms=2000.0),
+        _run(search_status="ok", claude_ms=4000.0),
+    ]
+    summary = summarise_runs(runs)
+    assert summary["runs"] == 4
+    assert summary["outcomes"] == {"created": 3, "quit": 1}
+    assert summary["failure_rates"]["tmdb_search"] == 0.5
+    assert summary["stages"]["claude"]["p50"] == pytest.approx(2500.0)
+    assert summary["usage"]["input_tokens"] == 8000
+    assert summary["claude_calls"] == 4
+
+
+def test_format_stats_mentions_each_stage():
+    text = format_stats(summarise_runs([_run(), _run(search_status="not_found")]))
+    assert "tmdb_search" in text
+    assert "not_found 1" in text
+    assert "Estimated cost" in text
+    assert format_stats(summarise_runs([])) == "No runs recorded yet."
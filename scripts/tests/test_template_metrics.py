@@ -0,0 +1,110 @@
+"""Tests for template_metrics.py.
+
+Parses captured Hugo output from tests/fixtures/ — Hugo itself is never run.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+import template_metrics
+from template_metrics import (
+    append_history,
+    compare_runs,
+    load_history,
+    parse_duration,
+    parse_metrics,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _records(name: str) -> list[dict]:
+    return parse_metrics((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize(
+    "text,expected_ms",
+    [
+        ("1.5s", 1500.0),
+        ("94.204874ms", 94.204874),
+        ("410.2µs", 0.4102),
+        ("800ns", 0.0008),
+        ("1m2.5s", 62500.0),
+        ("0", 0.0),
+    ],
+)
+def test_parse_duration(text: str, expected_ms: float):
+    assert parse_duration(text) == pytest.approx(expected_ms)
+
+
+def test_parse_duration_rejects_non_durations():
+    with pytest.raises(ValueError):
+        parse_duration("duration")
+
+
+def test_parse_metrics_with_hints_reads_every_row():
+    records = _records("hugo_template_metrics_hints.txt")
+    assert len(records) == 7
+    assert records[0]["template"] == "_default/single.html"
+    watches = next(r for r in records if r["template"] == "partials/recent_watches.html")
+    assert watches["count"] == 1
+    assert watches["cache_potential"] == 100
+    assert watches["cumulative_ms"] == pytest.approx(612.004011)
+
+
+def test_parse_metrics_hints_cached_columns():
+    footer = next(r for r in _records("hugo_template_metrics_hints.txt") if r["template"] == "footer.html")
+    assert footer["percent_cached"] == 94
+    assert footer["cached_count"] == 34
+    assert footer["count"] == 36
+
+
+def test_parse_metrics_plain_table_has_no_cache_fields():
+    records = _records("hugo_template_metrics_plain.txt")
+    assert [r["template"] for r in records] == ["_default/single.html", "partials/extend_head.html"]
+    assert records[0]["count"] == 12
+    assert records[0]["cumulative_ms"] == pytest.approx(62500.0)
+    assert "cache_potential" not in records[0]
+
+
+def test_parse_metrics_ignores_non_table_output():
+    assert parse_metrics("Start building sites …\nTotal in 2874 ms\n") == []
+
+
+def test_compare_runs_reports_growth_and_new_templates():
+    previous = [
+        {"template": "a.html", "cumulative_ms": 100.0, "count": 10},
+        {"template": "b.html", "cumulative_ms": 50.0, "count": 5},
+    ]
+    current = [
+        {"template": "a.html", "cumulative_ms": 300.0, "count": 20},
+        {"template": "b.html", "cumulative_ms": 52.0, "count": 5},
+        {"template": "c.html", "cumulative_ms": 40.0, "count": 1},
+    ]
+    regressions = compare_runs(previous, current, min_delta_ms=5.0)
+    assert [r["template"] for r in regressions] == ["a.html", "c.html"]
+    assert regressions[0]["percent"] == 200.0
+    assert regressions[0]["previous_count"] == 10
+    assert regressions[1]["percent"] is None
+
+
+def test_history_round_trip(tmp_path: Path):
+    path = tmp_path / "nested" / "history.jsonl"
+    append_history(path, {"timestamp": "t1", "records": []})
+    append_history(path, {"timestamp": "t2", "records": []})
+    with path.open("a", encoding="utf-8") as f:
+        f.write("not json\n")
+    assert [r["timestamp"] for r in load_history(path)] == ["t1", "t2"]
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[0])["timestamp"] == "t1"
+
+
+def test_summary_does_not_sum_nested_cumulative_times(monkeypatch: pytest.MonkeyPatch, capsys):
+    """single.html's time already includes its partials, so no grand total is printed."""
+    monkeypatch.setattr("sys.argv", [
+        "template_metrics.py", "--from-file", str(FIXTURES / "hugo_template_metrics_hints.txt"), "--no-save",
+    ])
+    template_metrics.main()
+    out = capsys.readouterr().out
+    assert "\n7 templates\n" in out
+    assert "cumulative template time" not in out